@@ -13,6 +13,10 @@ from pydantic import BaseModel
 import os
 import sys
 import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
 import uuid
 import hashlib
 from datetime import datetime
@@ -29,11 +33,23 @@ from classifier.doc_classifier import DocumentClassifier
 from risk.risk_engine import RiskEngine
 from utils.file_utils import FileUtils
 from blockchain import BlockchainManager, SemanticHasher, TamperDetector, mock_blockchain
-from database import get_db, init_db, crud
+from database import get_db, get_async_db, init_db, crud
 from translation.translator import TextTranslator
 from reports.report_generator import ReportGenerator
 from extract_rtc_fields import extract_rtc_fields
 
+# Log records are queued by the request handlers and written to stderr by a
+# background listener thread, so logging never blocks the event loop on IO
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    handlers=[QueueHandler(log_queue)]
+)
+log_listener.start()
+atexit.register(log_listener.stop)  # drain queued records on exit
+
 app = FastAPI(
     title="PropTrust API",
     description="AI-Blockchain Property Document Verification System",
@@ -56,6 +72,7 @@ if frontend_path.exists():
 
 # Initialize components
 ocr_engine = OCREngine()
+atexit.register(ocr_engine.close)  # stop OCR page workers on exit
 text_cleaner = TextCleaner()
 ner_extractor = NERExtractor()
 classifier = DocumentClassifier()
@@ -71,7 +88,6 @@ tamper_detector = None
 # Initialize database
 try:
     init_db()
-    print("✅ Database initialized")
 except Exception as e:
     print(f"⚠️  Database initialization warning: {e}")
 
@@ -201,7 +217,9 @@ async def verify_document(
             print(f"🆔 Existing Property ID: {existing_property.property_id}")
             
             # Get existing verification
-            existing_verification = crud.get_latest_verification(db, existing_property.property_id)
+            existing_verification = crud.get_latest_verification(
+                db, existing_property.property_id, with_details=True
+            )
             
             if existing_verification:
                 # Try to get detail, use getattr to avoid AttributeError
@@ -347,56 +365,67 @@ async def verify_document(
         print("\n💾 Step 9: Saving to Database...")
         verification_id = f"VER-{uuid.uuid4().hex[:8].upper()}"  # Define before try block
         try:
-            # Create property record with file hash
-            db_property = crud.create_property(
-                db=db,
-                property_id=property_id,
-                document_type=document_type,
-                document_path=file_path,
-                owner_name=verification_data["owner_name"],
-                survey_number=verification_data["survey_number"],
-                file_hash=file_hash  # Add file hash for deduplication
-            )
-            
-            # Create verification record
-            db_verification = crud.create_verification(
-                db=db,
-                verification_id=verification_id,
-                property_id=property_id,
-                risk_score=risk_assessment["risk_score"],
-                risk_level=risk_assessment["risk_level"],
-                verification_status="VERIFIED",
-                blockchain_hash=verification_hash or "N/A",
-                blockchain_tx_hash=blockchain_result["tx_hash"] if blockchain_result else None,
-                blockchain_block_number=blockchain_result["block_number"] if blockchain_result else None,
-                blockchain_timestamp=blockchain_result["timestamp"] if blockchain_result else None
-            )
-            
-            # Create verification detail
-            crud.create_verification_detail(
-                db=db,
-                verification_id=verification_id,
-                owner_name=verification_data["owner_name"],
-                survey_number=verification_data["survey_number"],
-                entities_json=entities,
-                classification_json=classification,
-                loan_detected=verification_data["loan_detected"],
-                legal_case_detected=verification_data["legal_case_detected"],
-                risk_factors=verification_data["risk_factors"],
-                recommendations=risk_assessment.get("recommendations", []),
-                ocr_text=cleaned_text,
-                translated_text=translated_text
-            )
-            
-            # Audit log
-            crud.create_audit_log(
-                db=db,
-                operation_type="VERIFY",
-                property_id=property_id,
-                status="SUCCESS",
-                message="Document verified successfully",
-                metadata_json={"blockchain_stored": bool(blockchain_result)}
-            )
+            # One transaction for all four records
+            with crud.write_unit(db):
+                # file_hash is unique: release it from the incomplete record
+                # being reprocessed
+                if existing_property is not None:
+                    existing_property.file_hash = None
+                
+                # Create property record with file hash
+                db_property = crud.create_property(
+                    db=db,
+                    property_id=property_id,
+                    document_type=document_type,
+                    document_path=file_path,
+                    owner_name=verification_data["owner_name"],
+                    survey_number=verification_data["survey_number"],
+                    file_hash=file_hash,  # Add file hash for deduplication
+                    commit=False
+                )
+                
+                # Create verification record
+                db_verification = crud.create_verification(
+                    db=db,
+                    verification_id=verification_id,
+                    property_id=property_id,
+                    risk_score=risk_assessment["risk_score"],
+                    risk_level=risk_assessment["risk_level"],
+                    verification_status="VERIFIED",
+                    blockchain_hash=verification_hash or "N/A",
+                    blockchain_tx_hash=blockchain_result["tx_hash"] if blockchain_result else None,
+                    blockchain_block_number=blockchain_result["block_number"] if blockchain_result else None,
+                    blockchain_timestamp=blockchain_result["timestamp"] if blockchain_result else None,
+                    commit=False
+                )
+                
+                # Create verification detail
+                crud.create_verification_detail(
+                    db=db,
+                    verification_id=verification_id,
+                    owner_name=verification_data["owner_name"],
+                    survey_number=verification_data["survey_number"],
+                    entities_json=entities,
+                    classification_json=classification,
+                    loan_detected=verification_data["loan_detected"],
+                    legal_case_detected=verification_data["legal_case_detected"],
+                    risk_factors=verification_data["risk_factors"],
+                    recommendations=risk_assessment.get("recommendations", []),
+                    ocr_text=cleaned_text,
+                    translated_text=translated_text,
+                    commit=False
+                )
+                
+                # Audit log
+                crud.create_audit_log(
+                    db=db,
+                    operation_type="VERIFY",
+                    property_id=property_id,
+                    status="SUCCESS",
+                    message="Document verified successfully",
+                    metadata_json={"blockchain_stored": bool(blockchain_result)},
+                    commit=False
+                )
             
             print("   ✅ Database saved")
         except Exception as e:
@@ -531,22 +560,23 @@ async def store_on_blockchain(
         print(f"   ✅ Block Number: {blockchain_result['block_number']}")
         print(f"   ✅ Status: {blockchain_result['status']}")
         
-        # Update database with blockchain info
-        db_verification.blockchain_hash = verification_hash
-        db_verification.blockchain_tx_hash = blockchain_result["tx_hash"]
-        db_verification.blockchain_block_number = blockchain_result["block_number"]
-        db_verification.blockchain_timestamp = blockchain_result["timestamp"]
-        db.commit()
-        
-        # Audit log
-        crud.create_audit_log(
-            db=db,
-            operation_type="BLOCKCHAIN_STORE",
-            property_id=property_id,
-            status="SUCCESS",
-            message="Verification stored on blockchain",
-            metadata_json={"tx_hash": blockchain_result["tx_hash"]}
-        )
+        # Update database with blockchain info and audit log in one commit
+        with crud.write_unit(db):
+            db_verification.blockchain_hash = verification_hash
+            db_verification.blockchain_tx_hash = blockchain_result["tx_hash"]
+            db_verification.blockchain_block_number = blockchain_result["block_number"]
+            db_verification.blockchain_timestamp = blockchain_result["timestamp"]
+            
+            # Audit log
+            crud.create_audit_log(
+                db=db,
+                operation_type="BLOCKCHAIN_STORE",
+                property_id=property_id,
+                status="SUCCESS",
+                message="Verification stored on blockchain",
+                metadata_json={"tx_hash": blockchain_result["tx_hash"]},
+                commit=False
+            )
         
         print("✅ BLOCKCHAIN STORAGE COMPLETE")
         print("="*70 + "\n")
@@ -636,8 +666,7 @@ async def check_tamper(
         print("🔍 Checking for tampering...")
         
         # Get the original verification from database
-        property_obj = crud.get_property(db, property_id)
-        if not property_obj:
+        if not crud.property_exists(db, property_id):
             return {
                 "success": False,
                 "tamper_check": {
@@ -648,7 +677,7 @@ async def check_tamper(
             }
         
         # Get blockchain record from database
-        verifications = crud.get_verifications_by_property(db, property_id)
+        verifications = crud.get_verifications_by_property(db, property_id, with_details=True)
         if not verifications or not verifications[0].blockchain_hash:
             return {
                 "success": True,
@@ -662,7 +691,7 @@ async def check_tamper(
             }
         
         original_verification = verifications[0]
-        detail = crud.get_verification_detail(db, original_verification.verification_id)
+        detail = original_verification.details
         
         # Generate hash for current document (exclude timestamp for comparison)
         current_hash = semantic_hasher.generate_hash(current_data, include_timestamp=False)
@@ -699,29 +728,32 @@ async def check_tamper(
         
         # Save tamper check to database
         try:
-            crud.create_tamper_check(
-                db=db,
-                property_id=property_id,
-                tampered=tamper_results["tampered"],
-                match_status=tamper_results["match_status"],
-                current_hash=tamper_results.get("current_hash"),
-                blockchain_hash=tamper_results.get("blockchain_hash"),
-                hash_matched=tamper_results.get("hash_matched"),
-                current_risk_score=tamper_results.get("current_risk_score"),
-                blockchain_risk_score=tamper_results.get("blockchain_risk_score"),
-                risk_score_changed=tamper_results.get("risk_score_changed"),
-                details_json=tamper_results.get("details", {}),
-                warnings=tamper_results.get("warnings", [])
-            )
-            
-            # Audit log
-            crud.create_audit_log(
-                db=db,
-                operation_type="TAMPER_CHECK",
-                property_id=property_id,
-                status="SUCCESS" if not tamper_results["tampered"] else "TAMPERED",
-                message=f"Tamper check: {tamper_results['match_status']}"
-            )
+            with crud.write_unit(db):
+                crud.create_tamper_check(
+                    db=db,
+                    property_id=property_id,
+                    tampered=tamper_results["tampered"],
+                    match_status=tamper_results["match_status"],
+                    current_hash=tamper_results.get("current_hash"),
+                    blockchain_hash=tamper_results.get("blockchain_hash"),
+                    hash_matched=tamper_results.get("hash_matched"),
+                    current_risk_score=tamper_results.get("current_risk_score"),
+                    blockchain_risk_score=tamper_results.get("blockchain_risk_score"),
+                    risk_score_changed=tamper_results.get("risk_score_changed"),
+                    details_json=tamper_results.get("details", {}),
+                    warnings=tamper_results.get("warnings", []),
+                    commit=False
+                )
+                
+                # Audit log
+                crud.create_audit_log(
+                    db=db,
+                    operation_type="TAMPER_CHECK",
+                    property_id=property_id,
+                    status="SUCCESS" if not tamper_results["tampered"] else "TAMPERED",
+                    message=f"Tamper check: {tamper_results['match_status']}",
+                    commit=False
+                )
         except Exception as e:
             print(f"   ⚠️  Database error: {e}")
         
@@ -755,13 +787,13 @@ async def check_tamper(
 
 
 @app.get("/api/verification/{verification_id}")
-async def get_verification(verification_id: str, db: Session = Depends(get_db)):
+async def get_verification(verification_id: str, db=Depends(get_async_db)):
     """Get verification record by ID"""
-    verification = crud.get_verification(db, verification_id)
+    verification = await db.run_sync(crud.get_verification, verification_id)
     if not verification:
         raise HTTPException(status_code=404, detail="Verification not found")
     
-    detail = crud.get_verification_detail(db, verification_id)
+    detail = await db.run_sync(crud.get_verification_detail, verification_id)
     
     return {
         "verification_id": verification.verification_id,
@@ -787,13 +819,13 @@ async def get_verification(verification_id: str, db: Session = Depends(get_db)):
 
 
 @app.get("/api/property/{property_id}")
-async def get_property_info(property_id: str, db: Session = Depends(get_db)):
+async def get_property_info(property_id: str, db=Depends(get_async_db)):
     """Get property information"""
-    property_obj = crud.get_property(db, property_id)
+    property_obj = await db.run_sync(crud.get_property, property_id)
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
     
-    verifications = crud.get_verifications_by_property(db, property_id)
+    verification_ids = await db.run_sync(crud.get_verification_ids_by_property, property_id)
     
     return {
         "property_id": property_obj.property_id,
@@ -801,24 +833,23 @@ async def get_property_info(property_id: str, db: Session = Depends(get_db)):
         "owner_name": property_obj.owner_name,
         "survey_number": property_obj.survey_number,
         "uploaded_at": property_obj.uploaded_at.isoformat(),
-        "verification_count": len(verifications),
-        "latest_verification": verifications[0].verification_id if verifications else None
+        "verification_count": len(verification_ids),
+        "latest_verification": verification_ids[0] if verification_ids else None
     }
 
 
 @app.delete("/api/verification/{property_id}")
-async def delete_verification(property_id: str, db: Session = Depends(get_db)):
+async def delete_verification(property_id: str, db=Depends(get_async_db)):
     """Delete verification and all related records"""
-    property_obj = crud.get_property(db, property_id)
-    if not property_obj:
+    if not await db.run_sync(crud.property_exists, property_id):
         raise HTTPException(status_code=404, detail="Verification not found")
     
-    success = crud.delete_verification(db, property_id)
+    success = await db.run_sync(crud.delete_verification, property_id)
     
     if success:
         # Log deletion
-        crud.create_audit_log(
-            db=db,
+        await db.run_sync(
+            crud.create_audit_log,
             operation_type="DELETE",
             property_id=property_id,
             status="SUCCESS",
@@ -858,10 +889,10 @@ async def blockchain_status():
 
 
 @app.get("/api/statistics")
-async def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db=Depends(get_async_db)):
     """Get system statistics"""
     try:
-        stats = crud.get_statistics(db)
+        stats = await db.run_sync(crud.get_statistics)
         return {
             "success": True,
             "statistics": stats
@@ -875,10 +906,10 @@ async def get_audit_logs(
     property_id: Optional[str] = None,
     operation_type: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db=Depends(get_async_db)
 ):
     """Get audit logs"""
-    logs = crud.get_audit_logs(db, property_id, operation_type, limit=limit)
+    logs = await db.run_sync(crud.get_audit_logs, property_id, operation_type, limit=limit)
     return {
         "success": True,
         "count": len(logs),
@@ -9,7 +9,7 @@ Run all 6 phases with a single command:
 6. Report Generation
 
 Usage:
-    python run_verification.py <pdf_file_path>
+    python run_verification.py <pdf_file_path> [--pretty]
     
 Example:
     python run_verification.py data/raw_docs/178.1.pdf
@@ -53,13 +53,14 @@ class VerificationPipeline:
         
         print("✅ All components initialized")
     
-    def run(self, pdf_path: str, open_report: bool = True) -> dict:
+    def run(self, pdf_path: str, open_report: bool = True, pretty_json: bool = False) -> dict:
         """
         Run complete verification pipeline
         
         Args:
             pdf_path: Path to PDF document
             open_report: Whether to open HTML report after generation
+            pretty_json: Indent the cleaned-text JSON for humans
             
         Returns:
             Dictionary with all output file paths
@@ -141,7 +142,8 @@ class VerificationPipeline:
             translated_file = f"data/ocr_text/{document_id}_ocr_translated.json"
             # Specify output file name to avoid _translated_cleaned naming
             cleaned_file = f"data/ocr_text/{document_id}_ocr_cleaned.json"
-            cleaned_output = self.cleaner.process_file(translated_file, output_file=cleaned_file)
+            cleaned_output = self.cleaner.process_file(translated_file, output_file=cleaned_file,
+                                                       pretty=pretty_json)
             results['outputs']['cleaned'] = cleaned_output
             print(f"✅ Text Cleaned: {len(cleaned_output.get('cleaned_text', ''))} characters")
             
@@ -260,19 +262,21 @@ def main():
     """Main entry point"""
     
     # Check command line arguments
-    if len(sys.argv) < 2:
+    pretty_json = '--pretty' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--pretty']
+    if not args:
         print("\n❌ Error: PDF file path required")
         print("\nUsage:")
-        print("   python run_verification.py <pdf_file_path>")
+        print("   python run_verification.py <pdf_file_path> [--pretty]")
         print("\nExample:")
         print("   python run_verification.py data/raw_docs/178.1.pdf")
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
+    pdf_path = args[0]
     
     # Run pipeline
     pipeline = VerificationPipeline()
-    results = pipeline.run(pdf_path)
+    results = pipeline.run(pdf_path, pretty_json=pretty_json)
     
     # Exit successfully
     sys.exit(0)
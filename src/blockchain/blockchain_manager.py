@@ -5,14 +5,68 @@ Handles Web3 integration and smart contract interaction
 
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
+from web3.exceptions import TransactionNotFound
+from eth_utils import to_checksum_address
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Gas limit for locally signed storeVerification transactions. A first-time
+# store (new record + property ID push) stays well below this; unused gas is
+# refunded, so a fixed ceiling avoids an eth_estimateGas round-trip per tx.
+STORE_VERIFICATION_GAS = 500_000
+
+# Event signatures emitted by PropertyVerification.storeVerification
+VERIFICATION_STORED_TOPIC = Web3.keccak(
+    text="VerificationStored(string,bytes32,uint256,uint256,address)"
+)
+VERIFICATION_UPDATED_TOPIC = Web3.keccak(
+    text="VerificationUpdated(string,bytes32,bytes32,uint256)"
+)
+
+# Connection pool for the JSON-RPC HTTP session
+RPC_POOL_SIZE = 64
+RPC_TIMEOUT = 10
+
+
+@lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    """Checksum an address (Keccak-256), memoized per address"""
+    return to_checksum_address(address)
+
+
+@lru_cache(maxsize=4096)
+def _hash_to_bytes(hash_hex: str) -> bytes:
+    """Convert a hex verification hash to bytes, memoized for re-verifications"""
+    return bytes.fromhex(hash_hex)
+
+
+def _build_rpc_session() -> requests.Session:
+    """Create a pooled keep-alive HTTP session for JSON-RPC calls"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=RPC_POOL_SIZE,
+        pool_maxsize=RPC_POOL_SIZE,
+        # Retry connection failures only; a read retry could resend a transaction
+        max_retries=Retry(total=3, read=0, backoff_factor=0.1, allowed_methods=None)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
 
 class BlockchainManager:
     """Manage blockchain operations for property verification"""
@@ -21,7 +75,13 @@ class BlockchainManager:
         self,
         provider_url: str = None,
         contract_address: str = None,
-        contract_abi_path: str = None
+        contract_abi_path: str = None,
+        private_key: str = None,
+        gas_price_ttl: float = 30.0,
+        verification_cache_ttl: float = 60.0,
+        verification_cache_size: int = 4096,
+        verified_index_retry: float = 300.0,
+        deployment_block: int = None
     ):
         """
         Initialize blockchain connection
@@ -30,6 +90,19 @@ class BlockchainManager:
             provider_url: Ethereum node URL (default: Ganache local)
             contract_address: Deployed contract address
             contract_abi_path: Path to contract ABI JSON
+            private_key: Key used to sign transactions locally (optional,
+                         default: BLOCKCHAIN_PRIVATE_KEY env var). Without it
+                         transactions are sent from the node's unlocked account.
+            gas_price_ttl: Seconds a fetched gas price is reused when signing
+            verification_cache_ttl: Seconds a get_verification() result is
+                                    reused (0 disables caching)
+            verification_cache_size: Max number of cached verification records
+            verified_index_retry: Seconds to skip the verified property
+                                  index after a failed refresh (lookups go
+                                  straight to the contract meanwhile)
+            deployment_block: Block the contract was deployed in, where log
+                              scans start (default: CONTRACT_DEPLOYMENT_BLOCK
+                              env var, else found with eth_getCode)
         """
         # Load configuration
         self.provider_url = provider_url or os.getenv(
@@ -37,9 +110,18 @@ class BlockchainManager:
             'http://127.0.0.1:8545'
         )
         self.contract_address = contract_address or os.getenv('CONTRACT_ADDRESS')
-        
-        # Initialize Web3
-        self.w3 = Web3(Web3.HTTPProvider(self.provider_url))
+        if deployment_block is None and os.getenv('CONTRACT_DEPLOYMENT_BLOCK'):
+            deployment_block = int(os.getenv('CONTRACT_DEPLOYMENT_BLOCK'))
+        self.deployment_block = deployment_block
+        
+        # Initialize Web3 over a shared keep-alive session so the many small
+        # RPC calls reuse TCP connections instead of reconnecting per request
+        self._rpc_session = _build_rpc_session()
+        self.w3 = Web3(Web3.HTTPProvider(
+            self.provider_url,
+            request_kwargs={'timeout': RPC_TIMEOUT},
+            session=self._rpc_session
+        ))
         
         # Add PoA middleware for Ganache
         self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
@@ -50,12 +132,49 @@ class BlockchainManager:
                 f"Failed to connect to Ethereum node at {self.provider_url}"
             )
         
+        # Chain ID never changes for a connection; fetch it once
+        self.chain_id = self.w3.eth.chain_id
+        
         print(f"✅ Connected to Ethereum node")
-        print(f"   Chain ID: {self.w3.eth.chain_id}")
+        print(f"   Chain ID: {self.chain_id}")
         print(f"   Latest Block: {self.w3.eth.block_number}")
         
-        # Set default account (first account from Ganache)
-        self.default_account = self.w3.eth.accounts[0] if self.w3.eth.accounts else None
+        # Local signing state (nonce is tracked locally after the first fetch)
+        private_key = private_key or os.getenv('BLOCKCHAIN_PRIVATE_KEY')
+        self._account = None
+        self._nonce = None
+        self._nonce_lock = threading.Lock()
+        self._gas_price = None
+        self._gas_price_fetched_at = 0.0
+        self.gas_price_ttl = gas_price_ttl
+        
+        # property_id -> (last scanned block, history entries) for log queries
+        self._history_log_cache: Dict[str, Tuple[int, list]] = {}
+        
+        # property_id -> (fetched at, record) for get_verification()
+        self.verification_cache_ttl = verification_cache_ttl
+        self.verification_cache_size = verification_cache_size
+        self._verification_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # property_id -> tx hash of stores sent without waiting for a receipt
+        self._pending_stores: Dict[str, Any] = {}
+        
+        # keccak(property_id) of every verified property, built from
+        # VerificationStored logs (None until first loaded)
+        self.verified_index_retry = verified_index_retry
+        self._verified_index: Optional[set] = None
+        self._verified_index_block = -1
+        self._verified_index_retry_at = float('-inf')
+        self._verified_index_lock = threading.Lock()
+        
+        if private_key:
+            self._account = self.w3.eth.account.from_key(private_key)
+            self.default_account = self._account.address
+            self._nonce = self.w3.eth.get_transaction_count(
+                self.default_account, 'pending'
+            )
+        else:
+            # Set default account (first account from Ganache)
+            self.default_account = self.w3.eth.accounts[0] if self.w3.eth.accounts else None
         if self.default_account:
             print(f"   Default Account: {self.default_account}")
         
@@ -77,7 +196,11 @@ class BlockchainManager:
             contract_abi = json.load(f)
         
         # Convert address to checksum format
-        contract_address = self.w3.to_checksum_address(contract_address)
+        contract_address = _checksum(contract_address)
+        
+        # A configured deployment block belongs to the configured address
+        if self.contract_address and _checksum(self.contract_address) != contract_address:
+            self.deployment_block = None
         
         # Create contract instance
         self.contract = self.w3.eth.contract(
@@ -86,6 +209,7 @@ class BlockchainManager:
         )
         
         self.contract_address = contract_address
+        self._reset_verified_index()
         print(f"✅ Contract loaded at: {self.contract_address}")
     
     def deploy_contract(
@@ -125,6 +249,8 @@ class BlockchainManager:
             abi=contract_abi
         )
         self.contract_address = contract_address
+        self.deployment_block = tx_receipt.blockNumber
+        self._reset_verified_index()
         
         return contract_address
     
@@ -133,7 +259,8 @@ class BlockchainManager:
         property_id: str,
         verification_hash: bytes,
         risk_score: int,
-        from_account: str = None
+        from_account: str = None,
+        wait_for_receipt: bool = True
     ) -> Dict[str, Any]:
         """
         Store verification hash on blockchain
@@ -143,6 +270,8 @@ class BlockchainManager:
             verification_hash: SHA-256 hash (32 bytes)
             risk_score: Risk score (0-100)
             from_account: Account to send transaction from
+            wait_for_receipt: Block until mined (False returns a pending
+                              result with only the tx hash)
             
         Returns:
             dict: Transaction details
@@ -160,21 +289,44 @@ class BlockchainManager:
         
         # Convert hash to bytes32 format
         if isinstance(verification_hash, str):
-            verification_hash = bytes.fromhex(verification_hash)
+            verification_hash = _hash_to_bytes(verification_hash)
         
         # Ensure hash is 32 bytes
         if len(verification_hash) != 32:
             raise ValueError("Verification hash must be 32 bytes")
         
-        # Build transaction
-        tx = self.contract.functions.storeVerification(
+        contract_call = self.contract.functions.storeVerification(
             property_id,
             verification_hash,
             risk_score
-        ).transact({'from': from_account})
+        )
+        
+        if self._account and from_account == self._account.address:
+            # Sign locally: only eth_sendRawTransaction goes over the wire
+            tx = self._send_signed_transaction(contract_call, STORE_VERIFICATION_GAS)
+        else:
+            tx = contract_call.transact({'from': from_account})
+        
+        if self._verified_index is not None:
+            self._verified_index.add(bytes(Web3.keccak(text=property_id)))
+        
+        if not wait_for_receipt:
+            # Not cached again until the receipt shows the tx was mined
+            self._pending_stores[property_id] = tx
+            self.invalidate(property_id)
+            return {
+                "tx_hash": tx.hex(),
+                "block_number": None,
+                "gas_used": None,
+                "status": "pending",
+                "property_id": property_id,
+                "contract_address": self.contract_address
+            }
         
         # Wait for transaction receipt
         tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx)
+        self._pending_stores.pop(property_id, None)
+        self.invalidate(property_id)
         
         # Parse result
         result = {
@@ -193,12 +345,57 @@ class BlockchainManager:
         
         return result
     
-    def get_verification(self, property_id: str) -> Dict[str, Any]:
+    def _get_gas_price(self) -> int:
+        """Get gas price, refreshed at most every gas_price_ttl seconds"""
+        now = time.monotonic()
+        if self._gas_price is None or now - self._gas_price_fetched_at > self.gas_price_ttl:
+            self._gas_price = self.w3.eth.gas_price
+            self._gas_price_fetched_at = now
+        return self._gas_price
+    
+    def _send_signed_transaction(self, contract_call, gas: int):
+        """
+        Build, sign and submit a contract transaction with the local account
+        
+        Gas, gas price, nonce and chain ID are all supplied locally so
+        web3 does not issue estimateGas/gasPrice/getTransactionCount RPCs.
+        
+        Args:
+            contract_call: Bound contract function (e.g. functions.foo(...))
+            gas: Gas limit for the transaction
+            
+        Returns:
+            HexBytes: Transaction hash
+        """
+        with self._nonce_lock:
+            tx = contract_call.build_transaction({
+                'from': self._account.address,
+                'chainId': self.chain_id,
+                'gas': gas,
+                'gasPrice': self._get_gas_price(),
+                'nonce': self._nonce
+            })
+            signed = self._account.sign_transaction(tx)
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            except Exception:
+                # Local nonce may be out of sync with the node; resync
+                self._nonce = self.w3.eth.get_transaction_count(
+                    self._account.address, 'pending'
+                )
+                raise
+            self._nonce += 1
+        return tx_hash
+    
+    def get_verification(self, property_id: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Retrieve verification record from blockchain
         
         Args:
             property_id: Property identifier
+            use_cache: Serve/refresh the TTL cache (False always reads the
+                       contract, e.g. for tamper checks, since writes by
+                       other managers or processes never invalidate it)
             
         Returns:
             dict: Verification record
@@ -214,10 +411,24 @@ class BlockchainManager:
         if not self.contract:
             raise ValueError("Contract not loaded")
         
+        # Records only change through storeVerification, so serve repeat
+        # lookups from the cache until the TTL expires or a write invalidates
+        use_cache = (
+            use_cache
+            and self.verification_cache_ttl > 0
+            and not self._store_pending(property_id)
+        )
+        cached = self._verification_cache.get(property_id) if use_cache else None
+        if cached is not None:
+            fetched_at, record = cached
+            if time.monotonic() - fetched_at <= self.verification_cache_ttl:
+                self._verification_cache.move_to_end(property_id)
+                return dict(record)
+        
         # Call contract function
         result = self.contract.functions.getVerification(property_id).call()
         
-        return {
+        record = {
             "property_id": result[0],
             "verification_hash": result[1].hex(),
             "risk_score": result[2],
@@ -225,6 +436,126 @@ class BlockchainManager:
             "verifier": result[4],
             "exists": result[5]
         }
+        
+        if use_cache:
+            self._verification_cache[property_id] = (time.monotonic(), record)
+            self._verification_cache.move_to_end(property_id)
+            if len(self._verification_cache) > self.verification_cache_size:
+                self._verification_cache.popitem(last=False)
+        
+        return dict(record)
+    
+    def _store_pending(self, property_id: str) -> bool:
+        """True while a store sent with wait_for_receipt=False is unmined"""
+        tx = self._pending_stores.get(property_id)
+        if tx is None:
+            return False
+        try:
+            self.w3.eth.get_transaction_receipt(tx)
+        except TransactionNotFound:
+            return True
+        # Mined: drop anything cached while it was pending
+        self._pending_stores.pop(property_id, None)
+        self.invalidate(property_id)
+        return False
+    
+    def invalidate(self, property_id: str = None):
+        """
+        Drop cached verification records
+        
+        Args:
+            property_id: Property to drop (None clears the whole cache)
+        """
+        if property_id is None:
+            self._verification_cache.clear()
+        else:
+            self._verification_cache.pop(property_id, None)
+    
+    def _reset_verified_index(self):
+        """Forget the verified index (contract changed)"""
+        with self._verified_index_lock:
+            self._verified_index = None
+            self._verified_index_block = -1
+            self._verified_index_retry_at = float('-inf')
+    
+    def _find_deployment_block(self) -> int:
+        """First block where the contract has code (binary search, eth_getCode)"""
+        low, high = 0, self.w3.eth.block_number
+        while low < high:
+            mid = (low + high) // 2
+            if self.w3.eth.get_code(self.contract.address, block_identifier=mid):
+                high = mid
+            else:
+                low = mid + 1
+        return low
+    
+    def load_verified_index(self) -> set:
+        """
+        Build or extend the index of verified properties from event logs
+        
+        Every first-time store emits VerificationStored with the property
+        ID as an indexed topic, so one eth_getLogs call over the blocks
+        mined since the last load yields keccak(property_id) for every
+        newly verified property. The first load starts at the contract's
+        deployment block rather than genesis.
+        
+        Returns:
+            set: keccak-256 digests (bytes) of verified property IDs
+        """
+        if not self.contract:
+            raise ValueError("Contract not loaded")
+        
+        with self._verified_index_lock:
+            if self._verified_index is None:
+                if self.deployment_block is None:
+                    self.deployment_block = self._find_deployment_block()
+                self._verified_index = set()
+                self._verified_index_block = self.deployment_block - 1
+            
+            latest_block = self.w3.eth.block_number
+            if latest_block > self._verified_index_block:
+                logs = self.w3.eth.get_logs({
+                    'address': self.contract.address,
+                    'fromBlock': self._verified_index_block + 1,
+                    'toBlock': latest_block,
+                    'topics': [VERIFICATION_STORED_TOPIC]
+                })
+                self._verified_index.update(bytes(log['topics'][1]) for log in logs)
+                self._verified_index_block = latest_block
+            
+            return self._verified_index
+    
+    def may_be_verified(self, property_id: str) -> bool:
+        """
+        Cheap pre-check before get_verification()
+        
+        A hit in the verified index means a full lookup is needed. On a
+        miss the index first catches up to the latest block, so stores
+        made by other workers or processes are seen and False is only
+        returned for properties with no VerificationStored event on chain.
+        
+        Args:
+            property_id: Property identifier
+            
+        Returns:
+            bool: False if the property is known not to be verified
+        """
+        if time.monotonic() < self._verified_index_retry_at:
+            return True
+        
+        key = bytes(Web3.keccak(text=property_id))
+        index = self._verified_index
+        if index is not None and key in index:
+            return True
+        
+        try:
+            index = self.load_verified_index()
+        except Exception as e:
+            # Back off; callers do full lookups until the retry window ends
+            self._verified_index_retry_at = time.monotonic() + self.verified_index_retry
+            print(f"⚠️  Could not refresh verified index: {e}")
+            return True
+        return key in index
     
     def verify_hash(self, property_id: str, verification_hash: bytes) -> bool:
         """
@@ -242,7 +573,7 @@ class BlockchainManager:
         
         # Convert hash if needed
         if isinstance(verification_hash, str):
-            verification_hash = bytes.fromhex(verification_hash)
+            verification_hash = _hash_to_bytes(verification_hash)
         
         # Call contract function
         return self.contract.functions.verifyHash(
@@ -278,8 +609,111 @@ class BlockchainManager:
         if not self.contract:
             raise ValueError("Contract not loaded")
         
-        history = self.contract.functions.getVerificationHistory(property_id).call()
-        return [h.hex() for h in history]
+        blob = b"".join(self._fetch_history(property_id)).hex()
+        # One hex conversion for the whole history, then split per hash
+        return [blob[i:i + 64] for i in range(0, len(blob), 64)]
+    
+    def history_bytes(self, property_id: str) -> np.ndarray:
+        """
+        Get verification history as raw hashes
+        
+        Args:
+            property_id: Property identifier
+            
+        Returns:
+            np.ndarray: uint8 array of shape (N, 32), one row per hash
+        """
+        if not self.contract:
+            raise ValueError("Contract not loaded")
+        
+        history = self._fetch_history(property_id)
+        return np.frombuffer(b"".join(history), dtype=np.uint8).reshape(-1, 32)
+    
+    def get_verification_history_via_logs(
+        self,
+        property_id: str,
+        from_block: int = 0
+    ) -> list:
+        """
+        Reconstruct verification history from contract event logs
+        
+        Uses one eth_getLogs call filtered on the indexed property ID
+        instead of reading the history array from contract storage.
+        Results are cached per property, so repeat calls only scan blocks
+        mined since the previous call.
+        
+        Args:
+            property_id: Property identifier
+            from_block: First block to scan on a cache miss
+            
+        Returns:
+            list: Chronological entries
+            [
+                {
+                    "event": "VerificationStored",
+                    "verification_hash": "a3f8...",
+                    "previous_hash": None,
+                    "risk_score": 45,
+                    "timestamp": 1234567890,
+                    "block_number": 123,
+                    "tx_hash": "0x..."
+                },
+                ...
+            ]
+        """
+        if not self.contract:
+            raise ValueError("Contract not loaded")
+        
+        last_block, entries = self._history_log_cache.get(
+            property_id, (from_block - 1, [])
+        )
+        latest_block = self.w3.eth.block_number
+        if latest_block <= last_block:
+            return list(entries)
+        
+        logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': last_block + 1,
+            'toBlock': latest_block,
+            'topics': [
+                [VERIFICATION_STORED_TOPIC, VERIFICATION_UPDATED_TOPIC],
+                Web3.keccak(text=property_id)
+            ]
+        })
+        
+        stored_event = self.contract.events.VerificationStored()
+        updated_event = self.contract.events.VerificationUpdated()
+        new_entries = []
+        for log in sorted(logs, key=lambda l: (l['blockNumber'], l['logIndex'])):
+            if log['topics'][0] == VERIFICATION_STORED_TOPIC:
+                args = stored_event.process_log(log)['args']
+                entry = {
+                    "event": "VerificationStored",
+                    "verification_hash": args['verificationHash'].hex(),
+                    "previous_hash": None,
+                    "risk_score": args['riskScore'],
+                    "timestamp": args['timestamp']
+                }
+            else:
+                args = updated_event.process_log(log)['args']
+                entry = {
+                    "event": "VerificationUpdated",
+                    "verification_hash": args['newHash'].hex(),
+                    "previous_hash": args['oldHash'].hex(),
+                    "risk_score": None,
+                    "timestamp": args['timestamp']
+                }
+            entry["block_number"] = log['blockNumber']
+            entry["tx_hash"] = log['transactionHash'].hex()
+            new_entries.append(entry)
+        
+        entries = entries + new_entries
+        self._history_log_cache[property_id] = (latest_block, entries)
+        return list(entries)
+    
+    def _fetch_history(self, property_id: str) -> list:
+        """Call getVerificationHistory (list of bytes32)"""
+        return self.contract.functions.getVerificationHistory(property_id).call()
     
     def get_total_verifications(self) -> int:
         """Get total number of verified properties"""
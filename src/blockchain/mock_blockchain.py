@@ -5,6 +5,9 @@ No need for Ganache or real blockchain node
 """
 
 import hashlib
+import itertools
+import os
+import threading
 import time
 import secrets
 from typing import Dict, Any
@@ -20,9 +23,28 @@ class MockBlockchain:
     def __init__(self):
         """Initialize mock blockchain"""
         self.current_block_number = 1000000  # Start from a realistic block number
+        self._block_lock = threading.Lock()
         self.chain_id = 5777  # Ganache default chain ID for consistency
         self.network_name = "PropTrust Demo Network"
         
+        # Uniqueness of tx hashes comes from a per-instance counter plus salt
+        # sliced from a pre-fetched random pool (one urandom call per 256 tx)
+        self._tx_counter = itertools.count()
+        self._rand_pool = b""
+        self._rand_offset = 0
+        # Concurrent request threads share the pool
+        self._rand_lock = threading.Lock()
+        
+    def _random_bytes(self, n: int) -> bytes:
+        """Return n random bytes from the pre-fetched pool (thread-safe)"""
+        with self._rand_lock:
+            if self._rand_offset + n > len(self._rand_pool):
+                self._rand_pool = os.urandom(4096)
+                self._rand_offset = 0
+            start = self._rand_offset
+            self._rand_offset = start + n
+            return self._rand_pool[start:start + n]
+        
     def generate_transaction_hash(self, data: str) -> str:
         """
         Generate a realistic-looking transaction hash
@@ -33,12 +55,10 @@ class MockBlockchain:
         Returns:
             Transaction hash in format: 0x[64 hex characters]
         """
-        # Combine data with random salt for uniqueness
-        salt = secrets.token_hex(16)
-        combined = f"{data}_{salt}_{time.time()}"
-        
-        # Generate SHA-256 hash
-        hash_obj = hashlib.sha256(combined.encode())
+        # Feed data, random salt and counter straight into SHA-256
+        hash_obj = hashlib.sha256(data.encode())
+        hash_obj.update(self._random_bytes(16))
+        hash_obj.update(next(self._tx_counter).to_bytes(8, "big"))
         tx_hash = f"0x{hash_obj.hexdigest()}"
         
         return tx_hash
@@ -64,13 +84,14 @@ class MockBlockchain:
     
     def get_next_block_number(self) -> int:
         """
-        Get next block number (increments with each call)
+        Get next block number (increments with each call, thread-safe)
         
         Returns:
             Next block number
         """
-        self.current_block_number += 1
-        return self.current_block_number
+        with self._block_lock:
+            self.current_block_number += 1
+            return self.current_block_number
     
     def store_verification(
         self,
@@ -4,8 +4,9 @@ Generates deterministic SHA-256 hashes from verification results
 """
 
 import hashlib
+import hmac
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from datetime import datetime
 
 
@@ -16,48 +17,71 @@ class SemanticHasher:
         """Initialize semantic hasher"""
         self.encoding = 'utf-8'
     
-    def normalize_data(self, verification_data: Dict[str, Any]) -> Dict[str, Any]:
+    def normalize_data(
+        self,
+        verification_data: Dict[str, Any],
+        include_timestamp: bool = True
+    ) -> Dict[str, Any]:
         """
         Normalize verification data for consistent hashing
         
         Args:
             verification_data: Raw verification results
+            include_timestamp: Include verified_at (False leaves it out
+                               instead of generating a timestamp to discard)
             
         Returns:
             dict: Normalized data ready for hashing
         """
+        # Bind the lookup once; this runs for every record in bulk hashing
+        get = verification_data.get
+        entities = get("entities") or {}
+        
+        # verified_at default is only computed when the field is absent
+        if not include_timestamp:
+            verified_at = None
+        elif "verified_at" in verification_data:
+            verified_at = verification_data["verified_at"]
+        else:
+            verified_at = datetime.now().isoformat()
+        
+        # Risk factors are usually short and often already sorted
+        risk_factors = get("risk_factors") or []
+        if len(risk_factors) > 1:
+            risk_factors = sorted(risk_factors)
+        else:
+            risk_factors = list(risk_factors)
+        
         # Extract key fields
         normalized = {
-            "property_id": verification_data.get("property_id", "UNKNOWN"),
-            "document_type": verification_data.get("document_type", "RTC"),
-            "risk_score": verification_data.get("risk_score", 0),
-            "risk_level": verification_data.get("risk_level", "UNKNOWN"),
+            "property_id": get("property_id", "UNKNOWN"),
+            "document_type": get("document_type", "RTC"),
+            "risk_score": get("risk_score", 0),
+            "risk_level": get("risk_level", "UNKNOWN"),
             
             # Owner information
             "owner_name": self._normalize_name(
-                verification_data.get("owner_name") or 
-                verification_data.get("entities", {}).get("persons", [None])[0]
+                get("owner_name") or (entities.get("persons") or [None])[0]
             ),
             
             # Property details
             "survey_number": self._normalize_survey(
-                verification_data.get("survey_number") or
-                verification_data.get("entities", {}).get("survey_numbers", [None])[0]
+                get("survey_number") or (entities.get("survey_numbers") or [None])[0]
             ),
             
             # Critical findings
-            "loan_detected": verification_data.get("loan_detected", False),
-            "legal_case_detected": verification_data.get("legal_case_detected", False),
-            "mutation_status": verification_data.get("mutation_status", "UNKNOWN"),
+            "loan_detected": get("loan_detected", False),
+            "legal_case_detected": get("legal_case_detected", False),
+            "mutation_status": get("mutation_status", "UNKNOWN"),
             
             # Risk factors
-            "risk_factors": sorted(verification_data.get("risk_factors", [])),
-            
-            # Verification metadata (optional, can be excluded for re-verification)
-            "verified_at": verification_data.get("verified_at", 
-                                               datetime.now().isoformat())
+            "risk_factors": risk_factors
         }
         
+        # Verification metadata (optional, can be excluded for re-verification)
+        if include_timestamp:
+            normalized["verified_at"] = verified_at
+        
         return normalized
     
     def _normalize_name(self, name: str) -> str:
@@ -90,21 +114,65 @@ class SemanticHasher:
         Returns:
             str: SHA-256 hash (hex string)
         """
-        # Normalize data
-        normalized = self.normalize_data(verification_data)
+        payload = self.canonical_bytes(verification_data, include_timestamp)
         
-        # Remove timestamp if not needed (for re-verification comparison)
-        if not include_timestamp:
-            normalized.pop("verified_at", None)
+        # Generate SHA-256 hash
+        return hashlib.sha256(payload).hexdigest()
+    
+    def canonical_bytes(
+        self,
+        verification_data: Dict[str, Any],
+        include_timestamp: bool = True
+    ) -> bytes:
+        """
+        Serialize verification data to the canonical bytes that get hashed
         
+        Args:
+            verification_data: Verification results
+            include_timestamp: Whether to include timestamp
+            
+        Returns:
+            bytes: Deterministic UTF-8 JSON of the normalized data
+        """
+        # Normalize data (timestamp left out for re-verification comparison)
+        normalized = self.normalize_data(verification_data, include_timestamp)
+        return self._serialize(normalized)
+    
+    def _serialize(self, normalized: Dict[str, Any]) -> bytes:
+        """Serialize normalized data to deterministic JSON bytes"""
         # Sort keys for deterministic JSON
         json_string = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return json_string.encode(self.encoding)
+    
+    def hash_normalized(self, normalized: Dict[str, Any]) -> str:
+        """
+        Generate SHA-256 hash from data already passed through normalize_data
         
-        # Generate SHA-256 hash
-        hash_object = hashlib.sha256(json_string.encode(self.encoding))
-        hash_hex = hash_object.hexdigest()
+        Args:
+            normalized: Normalized verification data
+            
+        Returns:
+            str: SHA-256 hash (hex string)
+        """
+        return hashlib.sha256(self._serialize(normalized)).hexdigest()
+    
+    def normalize_and_hash(
+        self,
+        verification_data: Dict[str, Any],
+        include_timestamp: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Normalize data once and hash it, returning both
         
-        return hash_hex
+        Args:
+            verification_data: Verification results
+            include_timestamp: Whether to include timestamp in hash
+            
+        Returns:
+            tuple: (normalized data, SHA-256 hash hex)
+        """
+        normalized = self.normalize_data(verification_data, include_timestamp)
+        return normalized, self.hash_normalized(normalized)
     
     def generate_hash_bytes(
         self, 
@@ -144,6 +212,28 @@ class SemanticHasher:
         current_hash = self.generate_hash(verification_data, include_timestamp)
         return current_hash == expected_hash
     
+    def verify_hash_fast(self, digest_bytes: bytes, expected_hash: str) -> bool:
+        """
+        Verify a precomputed digest against an expected hash
+        
+        For callers that kept the hash_bytes from get_hash_metadata();
+        skips re-normalizing and re-serializing the verification data.
+        
+        Args:
+            digest_bytes: SHA-256 digest (32 bytes)
+            expected_hash: Expected hash (hex, with or without 0x prefix)
+            
+        Returns:
+            bool: True if hashes match
+        """
+        if expected_hash.startswith("0x"):
+            expected_hash = expected_hash[2:]
+        try:
+            # Constant-time comparison, as in TamperDetector.check_tamper
+            return hmac.compare_digest(digest_bytes, bytes.fromhex(expected_hash))
+        except ValueError:
+            return False
+    
     def get_hash_metadata(self, verification_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Get hash along with metadata for storage
@@ -159,19 +249,22 @@ class SemanticHasher:
                 "property_id": "PRT-001",
                 "risk_score": 45,
                 "algorithm": "SHA-256",
-                "timestamp": "2024-01-15T10:30:00"
+                "timestamp": "2024-01-15T10:30:00",
+                "canonical_bytes": b"{...}"
             }
         """
-        hash_hex = self.generate_hash(verification_data, include_timestamp=True)
+        payload = self.canonical_bytes(verification_data, include_timestamp=True)
+        digest = hashlib.sha256(payload).digest()
         
         return {
-            "hash": hash_hex,
-            "hash_bytes": bytes.fromhex(hash_hex),
+            "hash": digest.hex(),
+            "hash_bytes": digest,
             "property_id": verification_data.get("property_id", "UNKNOWN"),
             "risk_score": verification_data.get("risk_score", 0),
             "algorithm": "SHA-256",
             "timestamp": datetime.now().isoformat(),
-            "data_normalized": True
+            "data_normalized": True,
+            "canonical_bytes": payload
         }
 
 
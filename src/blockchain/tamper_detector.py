@@ -3,15 +3,38 @@ Tamper Detector Module
 Detects document tampering by comparing current hash with blockchain record
 """
 
+import hmac
+import io
+import logging
+from operator import itemgetter
 from typing import Dict, Any, Optional
 from .semantic_hasher import SemanticHasher
 from .blockchain_manager import BlockchainManager
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Normalized fields echoed in the detailed comparison (normalize_data
+# always sets all of them, so no defaults are needed)
+KEY_FIELD_NAMES = ("owner_name", "survey_number", "loan_detected", "legal_case_detected")
+_get_key_fields = itemgetter(*KEY_FIELD_NAMES)
+
+# Report layout: status header per match_status, unknown statuses are
+# formatted on the fly
+REPORT_RULE = "=" * 70
+STATUS_HEADERS = {
+    "VERIFIED": "✅ STATUS: VERIFIED - Document is authentic",
+    "TAMPERED": "❌ STATUS: TAMPERED - Document has been modified",
+    "NOT_FOUND": "⚠️  STATUS: NOT FOUND - First verification",
+}
+
 
 class TamperDetector:
     """Detect tampering in property documents"""
     
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = ('blockchain_manager', 'semantic_hasher')
+    
     def __init__(
         self,
         blockchain_manager: BlockchainManager = None,
@@ -50,9 +73,7 @@ class TamperDetector:
                 "details": {...}
             }
         """
-        print("\n" + "="*70)
-        print("TAMPER DETECTION CHECK")
-        print("="*70)
+        logger.info("Tamper detection check: %s", property_id)
         
         results = {
             "property_id": property_id,
@@ -71,47 +92,56 @@ class TamperDetector:
         }
         
         try:
-            # Step 1: Check if property exists on blockchain
-            is_verified = self.blockchain_manager.is_verified(property_id)
-            results["verification_exists"] = is_verified
+            # Step 1: Get blockchain record (exists=False if never verified).
+            # A verified-index miss is rechecked against the latest block first.
+            if self.blockchain_manager.may_be_verified(property_id):
+                blockchain_record = self.blockchain_manager.get_verification(
+                    property_id, use_cache=False
+                )
+            else:
+                blockchain_record = {"exists": False}
+            results["verification_exists"] = blockchain_record["exists"]
             
-            if not is_verified:
+            if not blockchain_record["exists"]:
                 results["match_status"] = "NOT_FOUND"
                 results["warnings"].append(
                     "Property not found on blockchain. This is the first verification."
                 )
-                print(f"⚠️  Property {property_id} not found on blockchain")
+                logger.warning("Property %s not found on blockchain", property_id)
                 return results
             
-            # Step 2: Get blockchain record
-            blockchain_record = self.blockchain_manager.get_verification(property_id)
+            # Step 2: Read blockchain record
             results["blockchain_hash"] = blockchain_record["verification_hash"]
             results["blockchain_risk_score"] = blockchain_record["risk_score"]
             results["blockchain_timestamp"] = blockchain_record["timestamp"]
             results["blockchain_verifier"] = blockchain_record["verifier"]
             
-            print(f"📜 Blockchain Record:")
-            print(f"   Hash: {blockchain_record['verification_hash'][:16]}...")
-            print(f"   Risk Score: {blockchain_record['risk_score']}")
+            logger.debug(
+                "Blockchain record: hash=%.16s... risk_score=%s",
+                blockchain_record["verification_hash"], blockchain_record["risk_score"]
+            )
             
             # Step 3: Generate current hash (without timestamp for comparison)
-            current_hash = self.semantic_hasher.generate_hash(
+            normalized_current, current_hash = self.semantic_hasher.normalize_and_hash(
                 current_verification_data,
                 include_timestamp=False
             )
             results["current_hash"] = current_hash
             results["current_risk_score"] = current_verification_data.get("risk_score", 0)
             
-            print(f"\n🔍 Current Document:")
-            print(f"   Hash: {current_hash[:16]}...")
-            print(f"   Risk Score: {results['current_risk_score']}")
+            logger.debug(
+                "Current document: hash=%.16s... risk_score=%s",
+                current_hash, results["current_risk_score"]
+            )
             
             # Step 4: Compare hashes
-            blockchain_hash_without_prefix = blockchain_record["verification_hash"]
-            if blockchain_hash_without_prefix.startswith("0x"):
-                blockchain_hash_without_prefix = blockchain_hash_without_prefix[2:]
+            blockchain_hash = blockchain_record["verification_hash"]
+            blockchain_hash_without_prefix = (
+                blockchain_hash[2:] if blockchain_hash[:2] == "0x" else blockchain_hash
+            )
             
-            hash_matched = (current_hash == blockchain_hash_without_prefix)
+            # Constant-time comparison (no early exit on first differing byte)
+            hash_matched = hmac.compare_digest(current_hash, blockchain_hash_without_prefix)
             results["hash_matched"] = hash_matched
             
             # Step 5: Check risk score changes
@@ -124,7 +154,7 @@ class TamperDetector:
             if hash_matched and not risk_score_changed:
                 results["tampered"] = False
                 results["match_status"] = "VERIFIED"
-                print(f"\n✅ VERIFICATION SUCCESS: Document is authentic")
+                logger.info("Verification success: %s is authentic", property_id)
                 
             elif hash_matched and risk_score_changed:
                 results["tampered"] = False
@@ -133,7 +163,7 @@ class TamperDetector:
                     "Hash matched but risk score changed. "
                     "This may indicate risk assessment model update."
                 )
-                print(f"\n⚠️  PARTIAL MATCH: Hash verified but risk score changed")
+                logger.warning("Partial match for %s: hash verified but risk score changed", property_id)
                 
             else:
                 results["tampered"] = True
@@ -141,11 +171,11 @@ class TamperDetector:
                 results["warnings"].append(
                     "Hash mismatch detected! Document may have been tampered with."
                 )
-                print(f"\n❌ TAMPER DETECTED: Hash mismatch!")
+                logger.warning("Tamper detected for %s: hash mismatch", property_id)
             
             # Step 7: Detailed comparison
             results["details"] = self._generate_detailed_comparison(
-                current_verification_data,
+                normalized_current,
                 blockchain_record,
                 results
             )
@@ -153,22 +183,19 @@ class TamperDetector:
         except Exception as e:
             results["match_status"] = "ERROR"
             results["warnings"].append(f"Error during tamper check: {str(e)}")
-            print(f"\n❌ Error: {e}")
+            logger.exception("Tamper check failed for %s", property_id)
         
         return results
     
     def _generate_detailed_comparison(
         self,
-        current_data: Dict[str, Any],
+        normalized_current: Dict[str, Any],
         blockchain_record: Dict[str, Any],
         results: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Generate detailed comparison report"""
-        
-        # Normalize current data
-        normalized_current = self.semantic_hasher.normalize_data(current_data)
+        """Generate detailed comparison report from already-normalized data"""
         
-        comparison = {
+        return {
             "hash_comparison": {
                 "current": results["current_hash"][:32] + "...",
                 "blockchain": results["blockchain_hash"][:32] + "...",
@@ -182,20 +209,13 @@ class TamperDetector:
                 ),
                 "changed": results["risk_score_changed"]
             },
-            "key_fields": {
-                "owner_name": normalized_current.get("owner_name", "UNKNOWN"),
-                "survey_number": normalized_current.get("survey_number", "UNKNOWN"),
-                "loan_detected": normalized_current.get("loan_detected", False),
-                "legal_case_detected": normalized_current.get("legal_case_detected", False)
-            },
+            "key_fields": dict(zip(KEY_FIELD_NAMES, _get_key_fields(normalized_current))),
             "blockchain_metadata": {
                 "timestamp": blockchain_record["timestamp"],
                 "verifier": blockchain_record["verifier"],
                 "block_verified": True
             }
         }
-        
-        return comparison
     
     def generate_tamper_report(
         self,
@@ -210,58 +230,61 @@ class TamperDetector:
         Returns:
             str: Formatted report
         """
-        report_lines = []
-        report_lines.append("="*70)
-        report_lines.append("TAMPER DETECTION REPORT")
-        report_lines.append("="*70)
-        report_lines.append(f"Property ID: {tamper_results['property_id']}")
-        report_lines.append(f"Check Time: {tamper_results['checked_at']}")
-        report_lines.append("")
+        r = tamper_results
+        buf = io.StringIO()
+        w = buf.write
         
-        # Status
-        status = tamper_results['match_status']
-        if status == "VERIFIED":
-            report_lines.append("✅ STATUS: VERIFIED - Document is authentic")
-        elif status == "TAMPERED":
-            report_lines.append("❌ STATUS: TAMPERED - Document has been modified")
-        elif status == "NOT_FOUND":
-            report_lines.append("⚠️  STATUS: NOT FOUND - First verification")
-        else:
-            report_lines.append(f"⚠️  STATUS: {status}")
+        w(REPORT_RULE + "\n")
+        w("TAMPER DETECTION REPORT\n")
+        w(REPORT_RULE + "\n")
+        w(f"Property ID: {r['property_id']}\n")
+        w(f"Check Time: {r['checked_at']}\n\n")
         
-        report_lines.append("")
+        # Status
+        status = r['match_status']
+        w(STATUS_HEADERS.get(status) or f"⚠️  STATUS: {status}")
+        w("\n\n")
         
         # Hash comparison
-        if tamper_results.get("blockchain_hash"):
-            report_lines.append("HASH COMPARISON:")
-            report_lines.append(f"  Current:    {tamper_results['current_hash'][:32]}...")
-            report_lines.append(f"  Blockchain: {tamper_results['blockchain_hash'][:32]}...")
-            report_lines.append(f"  Matched: {'✅ Yes' if tamper_results['hash_matched'] else '❌ No'}")
-            report_lines.append("")
+        if r.get("blockchain_hash"):
+            w("HASH COMPARISON:\n")
+            w(f"  Current:    {r['current_hash'][:32]}...\n")
+            w(f"  Blockchain: {r['blockchain_hash'][:32]}...\n")
+            w(f"  Matched: {'✅ Yes' if r['hash_matched'] else '❌ No'}\n\n")
         
         # Risk score comparison
-        if tamper_results.get("blockchain_risk_score") is not None:
-            report_lines.append("RISK SCORE COMPARISON:")
-            report_lines.append(f"  Current:    {tamper_results['current_risk_score']}")
-            report_lines.append(f"  Blockchain: {tamper_results['blockchain_risk_score']}")
-            report_lines.append(f"  Changed: {'⚠️  Yes' if tamper_results['risk_score_changed'] else '✅ No'}")
-            report_lines.append("")
+        if r.get("blockchain_risk_score") is not None:
+            w("RISK SCORE COMPARISON:\n")
+            w(f"  Current:    {r['current_risk_score']}\n")
+            w(f"  Blockchain: {r['blockchain_risk_score']}\n")
+            w(f"  Changed: {'⚠️  Yes' if r['risk_score_changed'] else '✅ No'}\n\n")
         
         # Warnings
-        if tamper_results["warnings"]:
-            report_lines.append("WARNINGS:")
-            for warning in tamper_results["warnings"]:
-                report_lines.append(f"  ⚠️  {warning}")
-            report_lines.append("")
+        if r["warnings"]:
+            w("WARNINGS:\n")
+            for warning in r["warnings"]:
+                w(f"  ⚠️  {warning}\n")
+            w("\n")
         
-        report_lines.append("="*70)
+        w(REPORT_RULE)
         
-        return "\n".join(report_lines)
+        return buf.getvalue()
 
 
 # Example usage
 if __name__ == "__main__":
-    import json
+    try:
+        import orjson
+        
+        def _dumps(obj) -> str:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode('utf-8')
+    except ImportError:
+        import json
+        
+        def _dumps(obj) -> str:
+            return json.dumps(obj, indent=2, default=str)
+    
+    logging.basicConfig(level=logging.DEBUG)
     
     # Sample verification data
     sample_data = {
@@ -283,7 +306,7 @@ if __name__ == "__main__":
     # Check for tampering
     results = detector.check_tamper("PRT-178-001", sample_data)
     
-    print("\n" + json.dumps(results, indent=2, default=str))
+    print("\n" + _dumps(results))
     
     # Generate report
     report = detector.generate_tamper_report(results)
@@ -2,7 +2,10 @@
 Database Package
 """
 
-from .database import Base, engine, SessionLocal, get_db, init_db, drop_db
+from .database import (
+    Base, engine, SessionLocal, get_db, init_db, drop_db,
+    async_engine, AsyncSessionLocal, get_async_db
+)
 from .models import Property, VerificationRecord, VerificationDetail, TamperCheck, AuditLog
 from . import crud
 
@@ -11,6 +14,9 @@ __all__ = [
     "engine",
     "SessionLocal",
     "get_db",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_async_db",
     "init_db",
     "drop_db",
     "Property",
@@ -2,11 +2,64 @@
 CRUD Operations for Database
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, exists, func, insert, lambda_stmt, select, true
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from contextlib import contextmanager
+from collections import OrderedDict
+import logging
+import threading
 from . import models
 
+logger = logging.getLogger(__name__)
+
+
+# file_hash -> Property primary key for dedup lookups (process-wide LRU)
+FILE_HASH_CACHE_SIZE = 8192
+_file_hash_cache: "OrderedDict[str, int]" = OrderedDict()
+_file_hash_lock = threading.Lock()
+
+
+# ============= Transactions =============
+
+@contextmanager
+def write_unit(db: Session):
+    """
+    Group several writes into one transaction (one commit)
+    
+    Call create_* functions with commit=False inside the block:
+    
+        with write_unit(db):
+            create_property(db, ..., commit=False)
+            create_audit_log(db, ..., commit=False)
+    
+    Commits on exit, rolls back and re-raises on error.
+    """
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _save(db: Session, obj, commit: bool, refresh: bool = True):
+    """
+    Add a new row; commit (and refresh it), or only flush inside write_unit
+    
+    refresh=False skips the post-commit SELECT for write-mostly rows; the
+    returned object is expired and reloads lazily if a caller reads it.
+    """
+    db.add(obj)
+    if commit:
+        db.commit()
+        if refresh:
+            db.refresh(obj)
+    else:
+        db.flush()
+    return obj
+
 
 # ============= Property CRUD =============
 
@@ -18,7 +71,8 @@ def create_property(
     owner_name: str = None,
     survey_number: str = None,
     user_id: str = None,
-    file_hash: str = None
+    file_hash: str = None,
+    commit: bool = True
 ) -> models.Property:
     """Create new property record"""
     db_property = models.Property(
@@ -30,24 +84,60 @@ def create_property(
         survey_number=survey_number,
         user_id=user_id
     )
-    db.add(db_property)
-    db.commit()
-    db.refresh(db_property)
-    return db_property
+    return _save(db, db_property, commit)
+
 
+# Hot point lookups use lambda_stmt: the statement is built and compiled
+# once per call site and cached; closure variables become bound parameters
 
 def get_property(db: Session, property_id: str) -> Optional[models.Property]:
     """Get property by ID"""
-    return db.query(models.Property).filter(
+    stmt = lambda_stmt(lambda: select(models.Property).where(
+        models.Property.property_id == property_id
+    ))
+    return db.execute(stmt).scalars().first()
+
+
+def property_exists(db: Session, property_id: str) -> bool:
+    """Check whether a property exists (SELECT EXISTS, no row loaded)"""
+    stmt = lambda_stmt(lambda: select(exists().where(
         models.Property.property_id == property_id
-    ).first()
+    )))
+    return bool(db.execute(stmt).scalar())
 
 
 def get_property_by_file_hash(db: Session, file_hash: str) -> Optional[models.Property]:
-    """Get property by file hash (for deduplication)"""
-    return db.query(models.Property).filter(
+    """
+    Get property by file hash (for deduplication)
+    
+    Hashes seen before resolve through a primary-key get (often served from
+    the session identity map). A cached entry is re-checked against the
+    row, so deleted or re-hashed properties fall through to the query.
+    """
+    with _file_hash_lock:
+        pk = _file_hash_cache.get(file_hash)
+        if pk is not None:
+            _file_hash_cache.move_to_end(file_hash)
+    
+    if pk is not None:
+        db_property = db.get(models.Property, pk)
+        if db_property is not None and db_property.file_hash == file_hash:
+            return db_property
+        with _file_hash_lock:
+            _file_hash_cache.pop(file_hash, None)
+    
+    stmt = lambda_stmt(lambda: select(models.Property).where(
         models.Property.file_hash == file_hash
-    ).first()
+    ))
+    db_property = db.execute(stmt).scalars().first()
+    
+    if db_property is not None:
+        with _file_hash_lock:
+            _file_hash_cache[file_hash] = db_property.id
+            if len(_file_hash_cache) > FILE_HASH_CACHE_SIZE:
+                _file_hash_cache.popitem(last=False)
+    
+    return db_property
 
 
 def get_properties(db: Session, skip: int = 0, limit: int = 100) -> List[models.Property]:
@@ -67,7 +157,8 @@ def create_verification(
     blockchain_hash: str,
     blockchain_tx_hash: str = None,
     blockchain_block_number: int = None,
-    blockchain_timestamp: int = None
+    blockchain_timestamp: int = None,
+    commit: bool = True
 ) -> models.VerificationRecord:
     """Create new verification record"""
     db_verification = models.VerificationRecord(
@@ -81,37 +172,67 @@ def create_verification(
         blockchain_block_number=blockchain_block_number,
         blockchain_timestamp=blockchain_timestamp
     )
-    db.add(db_verification)
-    db.commit()
-    db.refresh(db_verification)
-    return db_verification
+    return _save(db, db_verification, commit)
 
 
 def get_verification(db: Session, verification_id: str) -> Optional[models.VerificationRecord]:
     """Get verification by ID"""
-    return db.query(models.VerificationRecord).filter(
+    stmt = lambda_stmt(lambda: select(models.VerificationRecord).where(
         models.VerificationRecord.verification_id == verification_id
-    ).first()
+    ))
+    return db.execute(stmt).scalars().first()
+
+
+def _with_relations(stmt, with_details: bool, with_property: bool):
+    """Add eager loading for VerificationRecord relationships (avoids N+1)"""
+    if with_details:
+        stmt += lambda s: s.options(selectinload(models.VerificationRecord.details))
+    if with_property:
+        stmt += lambda s: s.options(joinedload(models.VerificationRecord.property))
+    return stmt
 
 
 def get_verifications_by_property(
     db: Session,
-    property_id: str
+    property_id: str,
+    with_details: bool = False,
+    with_property: bool = False
 ) -> List[models.VerificationRecord]:
-    """Get all verifications for a property"""
-    return db.query(models.VerificationRecord).filter(
+    """
+    Get all verifications for a property
+    
+    with_details / with_property eager-load those relationships in one
+    extra batched SELECT / a JOIN instead of one lazy SELECT per record.
+    """
+    stmt = lambda_stmt(lambda: select(models.VerificationRecord).where(
+        models.VerificationRecord.property_id == property_id
+    ))
+    stmt = _with_relations(stmt, with_details, with_property)
+    return list(db.execute(stmt).scalars())
+
+
+def get_verification_ids_by_property(db: Session, property_id: str) -> List[str]:
+    """Get verification IDs for a property (column-only, no ORM objects)"""
+    rows = db.query(models.VerificationRecord.verification_id).filter(
         models.VerificationRecord.property_id == property_id
     ).all()
+    return [row[0] for row in rows]
 
 
 def get_latest_verification(
     db: Session,
-    property_id: str
+    property_id: str,
+    with_details: bool = False,
+    with_property: bool = False
 ) -> Optional[models.VerificationRecord]:
-    """Get latest verification for a property"""
-    return db.query(models.VerificationRecord).filter(
+    """Get latest verification for a property (eager loading as above)"""
+    stmt = lambda_stmt(lambda: select(models.VerificationRecord).where(
         models.VerificationRecord.property_id == property_id
-    ).order_by(models.VerificationRecord.verified_at.desc()).first()
+    ).order_by(
+        models.VerificationRecord.verified_at.desc(), models.VerificationRecord.id.desc()
+    ).limit(1))
+    stmt = _with_relations(stmt, with_details, with_property)
+    return db.execute(stmt).scalars().first()
 
 
 # ============= Verification Detail CRUD =============
@@ -133,7 +254,8 @@ def create_verification_detail(
     risk_factors: List = None,
     recommendations: List = None,
     ocr_text: str = None,
-    translated_text: str = None
+    translated_text: str = None,
+    commit: bool = True
 ) -> models.VerificationDetail:
     """Create verification detail record"""
     db_detail = models.VerificationDetail(
@@ -154,10 +276,7 @@ def create_verification_detail(
         ocr_text=ocr_text,
         translated_text=translated_text
     )
-    db.add(db_detail)
-    db.commit()
-    db.refresh(db_detail)
-    return db_detail
+    return _save(db, db_detail, commit)
 
 
 def get_verification_detail(
@@ -165,9 +284,10 @@ def get_verification_detail(
     verification_id: str
 ) -> Optional[models.VerificationDetail]:
     """Get verification detail"""
-    return db.query(models.VerificationDetail).filter(
+    stmt = lambda_stmt(lambda: select(models.VerificationDetail).where(
         models.VerificationDetail.verification_id == verification_id
-    ).first()
+    ))
+    return db.execute(stmt).scalars().first()
 
 
 # ============= Tamper Check CRUD =============
@@ -184,7 +304,8 @@ def create_tamper_check(
     blockchain_risk_score: int = None,
     risk_score_changed: bool = None,
     details_json: Dict = None,
-    warnings: List = None
+    warnings: List = None,
+    commit: bool = True
 ) -> models.TamperCheck:
     """Create tamper check record"""
     db_check = models.TamperCheck(
@@ -200,10 +321,7 @@ def create_tamper_check(
         details_json=details_json or {},
         warnings=warnings or []
     )
-    db.add(db_check)
-    db.commit()
-    db.refresh(db_check)
-    return db_check
+    return _save(db, db_check, commit, refresh=False)
 
 
 def get_tamper_checks(
@@ -215,7 +333,9 @@ def get_tamper_checks(
     """Get tamper check history for a property"""
     return db.query(models.TamperCheck).filter(
         models.TamperCheck.property_id == property_id
-    ).order_by(models.TamperCheck.check_time.desc()).offset(skip).limit(limit).all()
+    ).order_by(
+        models.TamperCheck.check_time.desc(), models.TamperCheck.id.desc()
+    ).offset(skip).limit(limit).all()
 
 
 # ============= Audit Log CRUD =============
@@ -227,21 +347,29 @@ def create_audit_log(
     user_id: str = None,
     status: str = "SUCCESS",
     message: str = None,
-    metadata_json: Dict = None
-) -> models.AuditLog:
-    """Create audit log entry"""
-    db_log = models.AuditLog(
+    metadata_json: Dict = None,
+    commit: bool = True
+) -> int:
+    """
+    Create audit log entry
+    
+    Append-only, so the row is written with a Core INSERT on the table
+    (no ORM object, identity map or unit-of-work flush).
+    
+    Returns:
+        int: New audit log ID
+    """
+    result = db.execute(insert(models.AuditLog.__table__).values(
         operation_type=operation_type,
         property_id=property_id,
         user_id=user_id,
         status=status,
         message=message,
         metadata_json=metadata_json or {}
-    )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+    ))
+    if commit:
+        db.commit()
+    return result.inserted_primary_key[0]
 
 
 def get_audit_logs(
@@ -252,51 +380,148 @@ def get_audit_logs(
     limit: int = 100
 ) -> List[models.AuditLog]:
     """Get audit logs with optional filters"""
-    query = db.query(models.AuditLog)
+    # Each filter combination is its own cached lambda statement
+    stmt = lambda_stmt(lambda: select(models.AuditLog))
     
     if property_id:
-        query = query.filter(models.AuditLog.property_id == property_id)
+        stmt += lambda s: s.where(models.AuditLog.property_id == property_id)
     
     if operation_type:
-        query = query.filter(models.AuditLog.operation_type == operation_type)
+        stmt += lambda s: s.where(models.AuditLog.operation_type == operation_type)
     
-    return query.order_by(models.AuditLog.timestamp.desc()).offset(skip).limit(limit).all()
+    stmt += lambda s: s.order_by(
+        models.AuditLog.timestamp.desc(), models.AuditLog.id.desc()
+    ).offset(skip).limit(limit)
+    return list(db.execute(stmt).scalars())
+
+
+# ============= Bulk Inserts =============
+
+def _bulk_insert(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    defaults: Dict[str, Any]
+) -> List[int]:
+    """
+    Insert many rows in one executemany INSERT ... RETURNING and one commit
+    
+    Uses the Core table, so no ORM objects are created.
+    
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+        rows: Column values, one dict per row
+        defaults: Values for optional columns a row leaves out (every row
+                  must end up with the same keys for the batched INSERT;
+                  columns no row sets get their column default)
+            
+    Returns:
+        list: Primary keys of the inserted rows, in input order
+    """
+    if not rows:
+        return []
+    
+    table = model.__table__
+    params = [{**defaults, **row} for row in rows]
+    result = db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        params
+    )
+    ids = list(result.scalars())
+    db.commit()
+    return ids
+
+
+def bulk_create_properties(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Create many property records (keys as in create_property); returns row ids"""
+    return _bulk_insert(db, models.Property, rows, {
+        "document_path": None,
+        "owner_name": None,
+        "survey_number": None,
+        "user_id": None,
+        "file_hash": None
+    })
+
+
+def bulk_create_verifications(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Create many verification records (keys as in create_verification); returns row ids"""
+    return _bulk_insert(db, models.VerificationRecord, rows, {
+        "blockchain_tx_hash": None,
+        "blockchain_block_number": None,
+        "blockchain_timestamp": None
+    })
+
+
+def bulk_create_tamper_checks(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Create many tamper check records (keys as in create_tamper_check); returns row ids"""
+    return _bulk_insert(db, models.TamperCheck, rows, {
+        "current_hash": None,
+        "blockchain_hash": None,
+        "hash_matched": None,
+        "current_risk_score": None,
+        "blockchain_risk_score": None,
+        "risk_score_changed": None
+    })
+
+
+def bulk_create_audit_logs(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Create many audit log entries (keys as in create_audit_log); returns row ids"""
+    return _bulk_insert(db, models.AuditLog, rows, {
+        "property_id": None,
+        "user_id": None,
+        "status": "SUCCESS",
+        "message": None
+    })
 
 
 # ============= Statistics =============
 
 def get_statistics(db: Session) -> Dict[str, Any]:
-    """Get system statistics"""
-    total_properties = db.query(models.Property).count()
-    total_verifications = db.query(models.VerificationRecord).count()
-    total_tamper_checks = db.query(models.TamperCheck).count()
+    """Get system statistics (one round-trip, one scan per table)"""
+    Verification = models.VerificationRecord
+    Tamper = models.TamperCheck
+    
+    def count_where(condition):
+        # COUNT(CASE WHEN ... THEN 1 END) is portable across SQLite/Postgres/MySQL
+        return func.count(case((condition, 1)))
+    
+    verification_counts = select(
+        func.count().label("total"),
+        count_where(Verification.risk_level == "Low").label("low"),
+        count_where(Verification.risk_level == "Medium").label("medium"),
+        count_where(Verification.risk_level == "High").label("high")
+    ).select_from(Verification).subquery()
     
-    # Count by risk level
-    low_risk = db.query(models.VerificationRecord).filter(
-        models.VerificationRecord.risk_level == "Low"
-    ).count()
-    medium_risk = db.query(models.VerificationRecord).filter(
-        models.VerificationRecord.risk_level == "Medium"
-    ).count()
-    high_risk = db.query(models.VerificationRecord).filter(
-        models.VerificationRecord.risk_level == "High"
-    ).count()
+    tamper_counts = select(
+        func.count().label("total"),
+        count_where(Tamper.tampered == True).label("tampered")
+    ).select_from(Tamper).subquery()
     
-    # Tampered documents
-    tampered_count = db.query(models.TamperCheck).filter(
-        models.TamperCheck.tampered == True
-    ).count()
+    property_count = select(func.count()).select_from(models.Property).scalar_subquery()
+    
+    stats = db.execute(
+        select(
+            property_count.label("total_properties"),
+            verification_counts.c.total,
+            verification_counts.c.low,
+            verification_counts.c.medium,
+            verification_counts.c.high,
+            tamper_counts.c.total.label("total_tamper_checks"),
+            tamper_counts.c.tampered
+        ).select_from(verification_counts.join(tamper_counts, true()))
+    ).one()
     
     return {
-        "total_properties": total_properties,
-        "total_verifications": total_verifications,
-        "total_tamper_checks": total_tamper_checks,
+        "total_properties": stats.total_properties,
+        "total_verifications": stats.total,
+        "total_tamper_checks": stats.total_tamper_checks,
         "risk_distribution": {
-            "low": low_risk,
-            "medium": medium_risk,
-            "high": high_risk
+            "low": stats.low,
+            "medium": stats.medium,
+            "high": stats.high
         },
-        "tampered_documents": tampered_count
+        "tampered_documents": stats.tampered
     }
 
 
@@ -317,30 +542,28 @@ def delete_verification(db: Session, property_id: str) -> bool:
             models.TamperCheck.property_id == property_id
         ).delete(synchronize_session=False)
         
-        # 3. Get verification IDs for this property
-        verification_ids = [v.verification_id for v in db.query(models.VerificationRecord).filter(
+        # 3. Delete verification details of this property's verifications
+        #    (one DELETE with a subquery instead of one per verification)
+        verification_ids = db.query(models.VerificationRecord.verification_id).filter(
             models.VerificationRecord.property_id == property_id
-        ).all()]
-        
-        # 4. Delete verification details
-        for ver_id in verification_ids:
-            db.query(models.VerificationDetail).filter(
-                models.VerificationDetail.verification_id == ver_id
-            ).delete(synchronize_session=False)
+        )
+        db.query(models.VerificationDetail).filter(
+            models.VerificationDetail.verification_id.in_(verification_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
         
-        # 5. Delete verification records
+        # 4. Delete verification records
         db.query(models.VerificationRecord).filter(
             models.VerificationRecord.property_id == property_id
         ).delete(synchronize_session=False)
         
-        # 6. Delete property
+        # 5. Delete property
         db.query(models.Property).filter(
             models.Property.property_id == property_id
         ).delete(synchronize_session=False)
         
         db.commit()
         return True
-    except Exception as e:
+    except Exception:
         db.rollback()
-        print(f"Error deleting verification: {e}")
+        logger.exception("Error deleting verification %s", property_id)
         return False
@@ -2,29 +2,111 @@
 Database Configuration
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "sqlite:///./data/proptrust.db"  # Default to SQLite
 )
 
-# Create engine
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (
+    DATABASE_URL in ("sqlite://", "sqlite:///") or ":memory:" in DATABASE_URL
+)
+
+# SQLite connection tuning: WAL lets readers run alongside the writer and,
+# with synchronous=NORMAL, commits no longer fsync the main database file
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",  # 64 MB
+)
+
+engine_kwargs = {}
+if IS_SQLITE_MEMORY:
+    # One shared connection, otherwise each connection gets its own empty DB
+    engine_kwargs["poolclass"] = StaticPool
+elif not IS_SQLITE:
+    # Server databases: size the pool for concurrent API workers and
+    # transparently replace connections dropped by server idle timeouts
+    engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=30,
+        pool_recycle=3600,
+        pool_pre_ping=True
+    )
+
+# Create engine (bulk inserts are batched into multi-row INSERTs of up to
+# 10k rows; SQLAlchemy also caps each batch at the driver's parameter limit)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    insertmanyvalues_page_size=10_000,
+    **engine_kwargs
 )
 
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply SQLITE_PRAGMAS to every new DBAPI connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
 # Session maker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the same databases (optional installs)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL to its async-driver URL (None if unsupported)"""
+    scheme, sep, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    return f"{driver}{sep}{rest}" if driver and sep else None
+
+
+# Async engine, if an async driver is installed. An in-memory SQLite
+# database can't be shared between two engines, so it stays sync-only.
+async_engine = None
+AsyncSessionLocal = None
+ASYNC_DATABASE_URL = None if IS_SQLITE_MEMORY else _async_database_url(DATABASE_URL)
+if ASYNC_DATABASE_URL:
+    try:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            insertmanyvalues_page_size=10_000,
+            **engine_kwargs
+        )
+    except ImportError:
+        async_engine = None
+    else:
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+        if IS_SQLITE:
+            event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 # Base class for models
 Base = declarative_base()
 
@@ -43,13 +125,49 @@ def get_db():
         db.close()
 
 
+class ThreadedSession:
+    """
+    Async facade over a sync Session, used when no async driver is installed
+    
+    Mirrors AsyncSession.run_sync(): fn(session, *args, **kwargs) runs in a
+    worker thread so the event loop is not blocked.
+    """
+    
+    def __init__(self, session):
+        self.sync_session = session
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
+
+async def get_async_db():
+    """
+    Get database session for async endpoints
+    
+    Use as ``await db.run_sync(crud.some_function, ...)``: CRUD runs on
+    the async driver when one is installed, otherwise in a worker thread.
+    
+    Yields:
+        AsyncSession or ThreadedSession: Database session
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield ThreadedSession(db)
+        finally:
+            db.close()
+    else:
+        async with AsyncSessionLocal() as db:
+            yield db
+
+
 def init_db():
     """Initialize database (create all tables)"""
     Base.metadata.create_all(bind=engine)
-    print("✅ Database initialized")
+    logger.info("Database initialized")
 
 
 def drop_db():
     """Drop all tables (use with caution!)"""
     Base.metadata.drop_all(bind=engine)
-    print("⚠️  Database dropped")
+    logger.warning("Database dropped")
@@ -2,12 +2,38 @@
 Database Models for PropTrust
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
 
 
+# Binary JSONB on PostgreSQL (parsed once on write, GIN-indexable);
+# plain JSON on SQLite and other databases
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive DATETIME, for server-side defaults"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() follows the session time zone; convert it like datetime.utcnow
+    return "timezone('utc', now())"
+
+
 class Property(Base):
     """Property document record"""
     __tablename__ = "properties"
@@ -16,10 +42,10 @@ class Property(Base):
     property_id = Column(String(100), unique=True, index=True, nullable=False)
     document_type = Column(String(50), nullable=False)  # RTC, MR, EC, etc.
     document_path = Column(String(500))  # Path to original document
-    file_hash = Column(String(64), index=True)  # SHA-256 hash for deduplication
+    file_hash = Column(String(64), unique=True, index=True)  # SHA-256 hash for deduplication
     owner_name = Column(String(200))
     survey_number = Column(String(100))
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     user_id = Column(String(100), nullable=True)  # Optional: for multi-user system
     
     # Relationships
@@ -32,6 +58,10 @@ class Property(Base):
 class VerificationRecord(Base):
     """Verification record with blockchain reference"""
     __tablename__ = "verification_records"
+    __table_args__ = (
+        # Per-property lookups ordered by time (latest verification)
+        Index("ix_ver_prop_time", "property_id", "verified_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     verification_id = Column(String(100), unique=True, index=True, nullable=False)
@@ -39,7 +69,7 @@ class VerificationRecord(Base):
     
     # Verification results
     risk_score = Column(Integer, nullable=False)
-    risk_level = Column(String(50))  # Low, Medium, High
+    risk_level = Column(String(50), index=True)  # Low, Medium, High
     verification_status = Column(String(50))  # VERIFIED, TAMPERED, etc.
     
     # Blockchain references
@@ -49,7 +79,7 @@ class VerificationRecord(Base):
     blockchain_timestamp = Column(Integer)  # Unix timestamp from blockchain
     
     # Metadata
-    verified_at = Column(DateTime, default=datetime.utcnow)
+    verified_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     verification_method = Column(String(50), default="AI")  # AI, Manual, etc.
     
     # Relationships
@@ -73,10 +103,10 @@ class VerificationDetail(Base):
     land_extent = Column(String(100))
     
     # Extracted entities (JSON)
-    entities_json = Column(JSON)  # All extracted entities
+    entities_json = Column(JSONType, default=dict)  # All extracted entities
     
     # Classification results (JSON)
-    classification_json = Column(JSON)
+    classification_json = Column(JSONType, default=dict)
     
     # Risk factors
     loan_detected = Column(Boolean, default=False)
@@ -87,8 +117,8 @@ class VerificationDetail(Base):
     mutation_status = Column(String(50))
     
     # Risk assessment details (JSON)
-    risk_factors = Column(JSON)  # List of risk factors
-    recommendations = Column(JSON)  # List of recommendations
+    risk_factors = Column(JSONType, default=list)  # List of risk factors
+    recommendations = Column(JSONType, default=list)  # List of recommendations
     
     # OCR and processing
     ocr_text = Column(Text)  # Full OCR text
@@ -104,13 +134,17 @@ class VerificationDetail(Base):
 class TamperCheck(Base):
     """Tamper detection check history"""
     __tablename__ = "tamper_checks"
+    __table_args__ = (
+        # Per-property check history ordered by time
+        Index("ix_tamper_prop_time", "property_id", "check_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(String(100), ForeignKey("properties.property_id"), nullable=False)
     
     # Check results
-    check_time = Column(DateTime, default=datetime.utcnow)
-    tampered = Column(Boolean, nullable=False)
+    check_time = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
+    tampered = Column(Boolean, nullable=False, index=True)
     match_status = Column(String(50))  # VERIFIED, TAMPERED, NOT_FOUND
     
     # Hash comparison
@@ -124,8 +158,8 @@ class TamperCheck(Base):
     risk_score_changed = Column(Boolean)
     
     # Details (JSON)
-    details_json = Column(JSON)
-    warnings = Column(JSON)
+    details_json = Column(JSONType, default=dict)
+    warnings = Column(JSONType, default=list)
     
     def __repr__(self):
         return f"<TamperCheck(property_id='{self.property_id}', tampered={self.tampered})>"
@@ -136,11 +170,11 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), index=True)
     
     # Operation details
-    operation_type = Column(String(50), nullable=False)  # UPLOAD, VERIFY, TAMPER_CHECK, etc.
-    property_id = Column(String(100))
+    operation_type = Column(String(50), nullable=False, index=True)  # UPLOAD, VERIFY, TAMPER_CHECK, etc.
+    property_id = Column(String(100), index=True)
     user_id = Column(String(100))
     
     # Status
@@ -148,7 +182,7 @@ class AuditLog(Base):
     message = Column(Text)
     
     # Additional data
-    metadata_json = Column(JSON)
+    metadata_json = Column(JSONType, default=dict)
     
     def __repr__(self):
         return f"<AuditLog(operation='{self.operation_type}', status='{self.status}')>"
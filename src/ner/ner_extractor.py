@@ -4,41 +4,175 @@ Extracts entities like owner names, survey numbers, bank names, etc.
 """
 
 import spacy
+import os
+import mmap
 import re
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional
 from pathlib import Path
 import json
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:  # optional: substring scan fallback
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:  # optional: per-type regex gate fallback
+    hyperscan = None
+
+
+# Files at least this large are memory-mapped instead of read into bytes
+JSON_MMAP_THRESHOLD = int(os.getenv("PROPTRUST_JSON_MMAP_BYTES", str(4 * 1024 * 1024)))
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_json_file(path: Path):
+    """
+    Parse a JSON file, memory-mapping it when large (orjson only)
+    
+    Args:
+        path: JSON file path
+        
+    Returns:
+        Parsed JSON data
+    """
+    if orjson is None or path.stat().st_size < JSON_MMAP_THRESHOLD:
+        return _loads(path.read_bytes())
+    
+    # orjson parses the mapped pages directly, without a bytes copy
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+# Only doc.ents is used, so skip the default model's other components
+SPACY_DISABLE = ["parser", "tagger", "attribute_ruler", "lemmatizer"]
+SPACY_BATCH_SIZE = int(os.getenv("PROPTRUST_SPACY_BATCH", "64"))
+
+# Hugging Face token-classification groups -> spaCy labels used below
+ONNX_LABELS = {"PER": "PERSON", "ORG": "ORG", "LOC": "LOC"}
+
+
+@lru_cache(maxsize=4)
+def _load_spacy(model_path: Optional[str] = None):
+    """
+    Load a spaCy model once per process; later extractors share the Language
+    
+    Args:
+        model_path: Path to trained spaCy model (None: en_core_web_sm)
+        
+    Returns:
+        spacy.Language
+    """
+    if model_path:
+        return spacy.load(model_path)
+    
+    # Use default English model
+    try:
+        return spacy.load("en_core_web_sm", disable=SPACY_DISABLE)
+    except:
+        print("Downloading en_core_web_sm model...")
+        import subprocess
+        subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
+        return spacy.load("en_core_web_sm", disable=SPACY_DISABLE)
 
 
 class NERExtractor:
     """Entity extraction using spaCy NER and custom patterns"""
     
-    def __init__(self, model_path: str = None):
+    # Precompiled helpers for validation / cleanup (compiled once per process)
+    _LEADING_ZERO_DATE_RE = re.compile(r'^0+\d{1,2}/\d{1,2}$')
+    _DAY_MONTH_RE = re.compile(r'^\d{1,2}/\d{1,2}$')
+    _PURE_SURVEY_RE = re.compile(r'^\d{1,5}$')
+    _SURVEY_HISSA_RE = re.compile(r'^\d{1,4}[/\-]\d{1,3}[A-Za-z]?$')
+    _DATE_DMY_RE = re.compile(r'^\d{1,2}[/-]\d{1,2}[/-]\d{4}$')
+    _DATE_YMD_RE = re.compile(r'^\d{4}[/-]\d{1,2}[/-]\d{1,2}$')
+    _PAGE_MARKER_RE = re.compile(r'[._-]page[_-]?\d+', re.IGNORECASE)
+    _FILE_EXT_RE = re.compile(r'\.(jpg|jpeg|png|pdf|tiff?)$', re.IGNORECASE)
+    _SURVEY_SHAPE_RE = re.compile(r'^\d+([/\-]\d+[A-Za-z]?)?$')
+    _WORD_BOUNDARY_RE = re.compile(r'(?<!\\)\\[bB]')
+    
+    # Loan/mortgage indicators: substring hits (e.g. "discharged" counts as
+    # "charge"); the lookahead lets overlapping keywords all be found in one scan
+    LOAN_KEYWORDS = ('loan', 'mortgage', 'encumbrance', 'charge', 'hypothecation')
+    _LOAN_KW_RE = re.compile(r'(?=(' + '|'.join(LOAN_KEYWORDS) + r'))', re.IGNORECASE)
+    
+    # Bank names searched in RTC loan context (process_file)
+    _BANK_PATTERNS = [
+        re.compile(p, re.IGNORECASE) for p in (
+            r'(State Bank of Mysore|S\.?B\.?M\.?)',
+            r'(State Bank of India|SBI)',
+            r'(HDFC Bank|HDFC)',
+            r'(ICICI Bank|ICICI)',
+            r'(Axis Bank)',
+            r'(Canara Bank)',
+            r'(Bank of Baroda|BOB)',
+        )
+    ]
+    
+    def __init__(self, model_path: str = None, engine: str = None):
         """
         Initialize NER model
         
         Args:
-            model_path: Path to trained spaCy model (optional)
+            model_path: Path to trained spaCy model, or to an exported ONNX
+                token-classification model when engine is "onnx" (optional)
+            engine: "spacy" or "onnx" (default: PROPTRUST_NER_ENGINE or "spacy")
         """
-        # Load spaCy model
-        if model_path:
-            self.nlp = spacy.load(model_path)
+        self.engine = engine or os.getenv("PROPTRUST_NER_ENGINE", "spacy")
+        self.nlp = None
+        self.token_classifier = None
+        
+        if self.engine == "onnx":
+            self.token_classifier = self._load_onnx_pipeline(
+                model_path or os.getenv("PROPTRUST_NER_ONNX_MODEL")
+            )
+        elif self.engine == "spacy":
+            # Load spaCy model (cached per model path)
+            self.nlp = _load_spacy(model_path)
         else:
-            # Use default English model
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-            except:
-                print("Downloading en_core_web_sm model...")
-                import subprocess
-                subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-                self.nlp = spacy.load("en_core_web_sm")
+            raise ValueError(f"Unknown NER engine: {self.engine}")
         
         # Define custom patterns for property documents
         self.patterns = self._define_patterns()
+        # Mapping keys as compared: dots stripped, upper-cased (in mapping order)
+        self._bank_mapping_keys = [
+            (key.replace('.', '').upper(), normalized_name)
+            for key, normalized_name in self.bank_mappings.items()
+        ]
+        self._bank_ac = self._build_bank_automaton()
     
     def _define_patterns(self) -> Dict:
-        """Define regex patterns for entity extraction"""
+        """
+        Define regex patterns for entity extraction
+        
+        Also builds self.fused_patterns (one alternation per pattern type).
+        
+        Returns:
+            dict: Pattern type -> list of compiled (case-insensitive) regexes
+        """
         # Bank name mappings (full names, abbreviations, legacy names)
         self.bank_mappings = {
             'SBM': 'State Bank of Mysore (now SBI)',
@@ -55,7 +189,7 @@ class NERExtractor:
             'Union': 'Union Bank'
         }
         
-        return {
+        patterns = {
             'survey_no': [
                 r'Survey\s*(?:No|Number)\.?\s*[:\-]?\s*(\d+[/\-]?\d*[A-Za-z]?)',
                 r'(?:Sy\.?\s*No\.?\s*|S\.?\s*No\.?\s*)(\d+[/\-]?\d*[A-Za-z]?)',
@@ -64,7 +198,7 @@ class NERExtractor:
             ],
             'owner_name': [
                 r'(?:Owner|Holder|Name)[:\s]+([A-Z][a-z]+(?:\s+(?:Bin|S/o|D/o|W/o)\s+)?(?:[A-Z][a-z]+\s*){1,4})',
-                r'Name[:\s]+([A-Z][a-z]+(?:\s+(?:Bin|S/o|D/o|W/o|Bin)\s+)?(?:[A-Z][a-z]+\s*){1,4})',
+                r'Name[:\s]+([A-Z][a-z]+(?:\s+(?:Bin|S/o|D/o|W/o)\s+)?(?:[A-Z][a-z]+\s*){1,4})',
                 r'Cultivator[:\s]+([A-Z][a-z]+(?:\s+(?:Bin|S/o|D/o)\s+)?(?:[A-Z][a-z]+\s*){1,4})',
                 r'Pattadar[:\s]+([A-Z][a-z]+(?:\s+(?:Bin|S/o|D/o)\s+)?(?:[A-Z][a-z]+\s*){1,4})',
                 r'\b([A-Z][a-z]+\s+Bin\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',  # Indian name pattern with Bin
@@ -74,16 +208,6 @@ class NERExtractor:
                 r'Account\s*(?:No|Number)\.?\s*[:\-]?\s*(\d+)',
                 r'Hissa\s*(?:No|Number)\.?\s*[:\-]?\s*(\d+)',
             ],
-            'extent': [
-                r'Extent[:\s]*([\d.]+)\s*(?:Acres?|Guntas?|Hectares?)',
-                r'Area[:\s]*([\d.]+)\s*(?:Acres?|Guntas?|Hectares?)',
-                r'([\d.]+)\s*(?:Ac|Gnt|Ha)\b',
-            ],
-            'loan_bank': [
-                r'\b(SBI|State Bank|HDFC|ICICI|Axis Bank|Bank of Baroda|Canara Bank|PNB|Union Bank)\b',
-                r'(?:Loan|Mortgage|Charge)\s+(?:from|by|with)\s+([A-Z][a-z]+\s+Bank)',
-                r'\b([A-Z][a-z]+\s+Bank(?:\s+of\s+[A-Z][a-z]+)?)\b',
-            ],
             'loan_amount': [
                 r'(?:Loan|Amount|Rs\.?)[:\s]*(?:Rs\.?\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
                 r'₹\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',
@@ -107,10 +231,13 @@ class NERExtractor:
                 r'\b([A-Z\.]+)\s+(?:Bank|branch)\b'
             ],
             'extent': [
-                r'(\d+\.?\d*)\s*(?:Acre|Acres|acre|acres)',
-                r'(\d+\.?\d*)\s*(?:Hectare|Hectares|hectare|hectares|Ha|ha)',
-                r'(\d+\.?\d*)\s*(?:Cent|Cents|cent|cents)',
-                r'(\d+\.?\d*)\s*(?:Sq\.?\s*(?:ft|feet|meter|metre|m))'
+                r'(\d+\.?\d*)\s*(?:Acres?)',
+                r'(\d+\.?\d*)\s*(?:Hectares?|Ha)',
+                r'(\d+\.?\d*)\s*(?:Cents?)',
+                r'(\d+\.?\d*)\s*(?:Sq\.?\s*(?:ft|feet|meter|metre|m))',
+                r'Extent[:\s]*([\d.]+)\s*(?:Acres?|Guntas?|Hectares?)',
+                r'Area[:\s]*([\d.]+)\s*(?:Acres?|Guntas?|Hectares?)',
+                r'([\d.]+)\s*(?:Ac|Gnt|Ha)\b',
             ],
             'case_no': [
                 r'(?:Civil\s+Suit|C\.S\.|CS)\s*No\.?\s*(\d+[/\-]?\d*)',
@@ -129,13 +256,151 @@ class NERExtractor:
                 r'District[:\s]+([A-Z][a-zA-Z\s]+)'
             ]
         }
+        # Drop repeated patterns so each is compiled and scanned once
+        patterns = {pattern_type: list(dict.fromkeys(plist)) for pattern_type, plist in patterns.items()}
+        
+        # One alternation per type: a single scan tells whether any of its
+        # patterns can match at all, so types absent from the text cost one pass
+        self.fused_patterns = {
+            pattern_type: re.compile('|'.join(f'(?:{p})' for p in plist), re.IGNORECASE)
+            for pattern_type, plist in patterns.items()
+        }
+        self._build_hyperscan_db(patterns)
+        
+        return {
+            pattern_type: [re.compile(p, re.IGNORECASE) for p in plist]
+            for pattern_type, plist in patterns.items()
+        }
+    
+    def _build_hyperscan_db(self, patterns: Dict[str, List[str]]):
+        """
+        Compile every pattern into one Hyperscan database (when installed)
+        
+        Hyperscan reports which patterns match anywhere in a single DFA pass
+        over the text; only those are then run with re to get the captures.
+        
+        Args:
+            patterns: Pattern type -> list of regex strings
+        """
+        self._hs_db = None
+        self._hs_keys = [
+            (pattern_type, index)
+            for pattern_type, plist in patterns.items()
+            for index in range(len(plist))
+        ]
+        self._hs_local = threading.local()
+        if hyperscan is None:
+            return
+        
+        # Hyperscan has no \b in UCP mode; dropping it only loosens the gate,
+        # the re pass that follows still applies the exact pattern
+        expressions = [
+            self._WORD_BOUNDARY_RE.sub('', p).encode('utf-8')
+            for plist in patterns.values() for p in plist
+        ]
+        flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                 | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY)
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=flags
+            )
+        except hyperscan.error as e:
+            print(f"   [WARNING] Hyperscan disabled, using regex gates: {e}")
+            return
+        self._hs_db = database
     
-    def extract_entities(self, text: str) -> Dict:
+    def _scan_patterns(self, text: str):
+        """
+        Find which patterns match anywhere in text (one Hyperscan pass)
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            set: (pattern_type, index) pairs that match, or None without Hyperscan
+        """
+        if self._hs_db is None:
+            return None
+        try:
+            data = text.encode('utf-8')
+        except UnicodeEncodeError:
+            return None
+        
+        # Scratch space is per thread
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+        
+        hits = set()
+        keys = self._hs_keys
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(keys[pattern_id])
+        
+        self._hs_db.scan(data, match_event_handler=on_match, scratch=scratch)
+        return hits
+    
+    def _load_onnx_pipeline(self, model_path: str):
+        """
+        Load an ONNX Runtime token-classification pipeline (CPU)
+        
+        Export once with:
+            optimum-cli export onnx --task token-classification --model dslim/bert-base-NER --optimize O3 <dir>
+            optimum-cli onnxruntime quantize --avx2 --onnx_model <dir> -o <dir>
+        
+        Args:
+            model_path: Directory with the exported model and tokenizer
+            
+        Returns:
+            transformers pipeline with aggregation_strategy="simple"
+        """
+        if not model_path:
+            raise ValueError("engine='onnx' needs model_path or PROPTRUST_NER_ONNX_MODEL")
+        
+        from optimum.onnxruntime import ORTModelForTokenClassification
+        from transformers import AutoTokenizer, pipeline
+        
+        # Prefer the int8 dynamic-quantized weights when present
+        file_name = "model_quantized.onnx" if (Path(model_path) / "model_quantized.onnx").exists() else None
+        model = ORTModelForTokenClassification.from_pretrained(
+            model_path, file_name=file_name, provider="CPUExecutionProvider"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        print(f"Loaded ONNX NER model from {model_path}" + (" (int8)" if file_name else ""))
+        return pipeline("token-classification", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    
+    def _build_bank_automaton(self):
+        """
+        Build an Aho-Corasick automaton over the bank mapping keys
+        
+        Each key maps to (priority, normalized name), priority being the
+        mapping order, so the earliest mapping wins as in the plain scan.
+        
+        Returns:
+            ahocorasick.Automaton or None if pyahocorasick is not installed
+        """
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for priority, (key_clean, normalized_name) in enumerate(self._bank_mapping_keys):
+            if key_clean not in automaton:
+                automaton.add_word(key_clean, (priority, normalized_name))
+        automaton.make_automaton()
+        return automaton
+    
+    def extract_entities(self, text: str, doc=None) -> Dict:
         """
         Extract entities from text
         
         Args:
             text: Cleaned text
+            doc: Already parsed spaCy Doc for text, or the token-classification
+                output for the onnx engine (optional)
             
         Returns:
             dict: Extracted entities
@@ -158,51 +423,61 @@ class NERExtractor:
             "raw_locations": []
         }
         
-        # Use spaCy NER for general entities
-        doc = self.nlp(text)
+        # Which custom patterns occur at all (single Hyperscan pass, if available)
+        hits = self._scan_patterns(text)
         
-        for ent in doc.ents:
-            if ent.label_ == "PERSON":
-                entities["raw_persons"].append(ent.text)
-            elif ent.label_ == "ORG":
-                entities["raw_organizations"].append(ent.text)
-            elif ent.label_ in ["GPE", "LOC"]:
-                entities["raw_locations"].append(ent.text)
+        # Use the NER model (spaCy or ONNX) for general entities
+        if self.token_classifier is not None:
+            if doc is None:
+                doc = self.token_classifier(text)
+            spans = [(ent["word"], ONNX_LABELS.get(ent["entity_group"])) for ent in doc]
+        else:
+            if doc is None:
+                doc = self.nlp(text)
+            spans = [(ent.text, ent.label_) for ent in doc.ents]
+        
+        for ent_text, label in spans:
+            if label == "PERSON":
+                entities["raw_persons"].append(ent_text)
+            elif label == "ORG":
+                entities["raw_organizations"].append(ent_text)
+            elif label in ["GPE", "LOC"]:
+                entities["raw_locations"].append(ent_text)
         
         # Extract using custom patterns
-        survey_candidates = self._extract_pattern(text, 'survey_no')
-        date_candidates = self._extract_pattern(text, 'date')
+        survey_candidates = self._extract_pattern(text, 'survey_no', hits)
+        date_candidates = self._extract_pattern(text, 'date', hits)
         
         # Validate survey numbers vs dates
         entities["survey_numbers"] = self._validate_survey_numbers(survey_candidates, date_candidates)
         entities["dates"] = self._validate_dates(date_candidates, survey_candidates)
         
         # Extract and normalize bank names
-        bank_raw = self._extract_pattern(text, 'bank')
+        bank_raw = self._extract_pattern(text, 'bank', hits)
         entities["banks"] = self._normalize_bank_names(bank_raw)
-        entities["case_numbers"] = self._extract_pattern(text, 'case_no')
-        entities["extents"] = self._extract_pattern(text, 'extent')
+        entities["case_numbers"] = self._extract_pattern(text, 'case_no', hits)
+        entities["extents"] = self._extract_pattern(text, 'extent', hits)
         
         # Extract loan amounts
-        loan_amounts = self._extract_pattern(text, 'loan_amount')
+        loan_amounts = self._extract_pattern(text, 'loan_amount', hits)
         entities["loan_amounts"] = loan_amounts
         
         # Extract location details
-        villages = self._extract_pattern(text, 'village')
+        villages = self._extract_pattern(text, 'village', hits)
         if villages:
             entities["locations"]["village"] = villages[0]
         
-        taluks = self._extract_pattern(text, 'taluk')
+        taluks = self._extract_pattern(text, 'taluk', hits)
         if taluks:
             entities["locations"]["taluk"] = taluks[0]
         
-        districts = self._extract_pattern(text, 'district')
+        districts = self._extract_pattern(text, 'district', hits)
         if districts:
             entities["locations"]["district"] = districts[0]
         
         # Check for loan/mortgage indicators
-        loan_keywords = ['loan', 'mortgage', 'encumbrance', 'charge', 'hypothecation']
-        entities["loan_indicators"] = [kw for kw in loan_keywords if kw in text.lower()]
+        found = {m.group(1).lower() for m in self._LOAN_KW_RE.finditer(text)}
+        entities["loan_indicators"] = [kw for kw in self.LOAN_KEYWORDS if kw in found]
         
         # Determine if loan is present (check amounts too!)
         entities["loan_present"] = (
@@ -212,7 +487,7 @@ class NERExtractor:
         )
         
         # Extract owner names - try patterns first, then use spaCy NER as fallback
-        owner_pattern_matches = self._extract_pattern(text, 'owner_name')
+        owner_pattern_matches = self._extract_pattern(text, 'owner_name', hits)
         if owner_pattern_matches:
             entities["owner_names"] = owner_pattern_matches
         elif entities["raw_persons"]:
@@ -230,29 +505,56 @@ class NERExtractor:
         
         return entities
     
-    def _extract_pattern(self, text: str, pattern_type: str) -> List[str]:
+    def extract_entities_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """
+        Extract entities from many texts, batching the model pass (nlp.pipe for spaCy)
+        
+        Args:
+            texts: Cleaned texts
+            batch_size: Model batch size (default PROPTRUST_SPACY_BATCH or 64)
+            
+        Returns:
+            list: Extracted entities per text, in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.token_classifier is not None:
+            docs = self.token_classifier(texts, batch_size=batch_size or SPACY_BATCH_SIZE)
+        else:
+            docs = self.nlp.pipe(texts, batch_size=batch_size or SPACY_BATCH_SIZE)
+        return [self.extract_entities(text, doc=doc) for text, doc in zip(texts, docs)]
+    
+    def _extract_pattern(self, text: str, pattern_type: str, hits: set = None) -> List[str]:
         """
         Extract entities using regex patterns
         
         Args:
             text: Input text
             pattern_type: Type of pattern to use
+            hits: Matching (pattern_type, index) pairs from _scan_patterns
+                (optional; without it the fused per-type gate is used)
             
         Returns:
             list: Extracted values
         """
-        results = []
-        patterns = self.patterns.get(pattern_type, [])
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.groups():
-                    results.append(match.group(1).strip())
-                else:
-                    results.append(match.group(0).strip())
-        
-        return results
+        if hits is not None:
+            patterns = [
+                pattern for index, pattern in enumerate(self.patterns.get(pattern_type, []))
+                if (pattern_type, index) in hits
+            ]
+        else:
+            fused = self.fused_patterns.get(pattern_type)
+            if fused is None or fused.search(text) is None:
+                return []
+            patterns = self.patterns[pattern_type]
+        
+        # First capture group when the pattern has one, else the whole match
+        return [
+            match.group(1 if pattern.groups else 0).strip()
+            for pattern in patterns
+            for match in pattern.finditer(text)
+        ]
     
     def _validate_survey_numbers(self, survey_candidates: List[str], date_candidates: List[str]) -> List[str]:
         """Validate survey numbers against land-record formats - STRICT validation"""
@@ -261,11 +563,11 @@ class NERExtractor:
         for sn in survey_candidates:
             # CRITICAL FIX: Reject date-like patterns more strictly
             # Pattern 1: Leading zeros suggest dates (0028/11 = 28/11 date)
-            if re.match(r'^0+\d{1,2}/\d{1,2}$', sn):
+            if self._LEADING_ZERO_DATE_RE.match(sn):
                 continue  # Reject: likely date with leading zero
             
             # Pattern 2: Both parts <= 31 (day/month range)
-            if re.match(r'^\d{1,2}/\d{1,2}$', sn):
+            if self._DAY_MONTH_RE.match(sn):
                 parts = sn.split('/')
                 if len(parts) == 2:
                     n1, n2 = int(parts[0]), int(parts[1])
@@ -276,10 +578,10 @@ class NERExtractor:
             # STRICT VALIDATION: Valid survey formats only
             # Format 1: Pure number (178, 45, 923)
             # Format 2: Survey/Hissa (178/1, 45/2A)
-            if re.match(r'^\d{1,5}$', sn):  # Pure number (no slash)
+            if self._PURE_SURVEY_RE.match(sn):  # Pure number (no slash)
                 if int(sn) > 0 and len(sn) <= 5:
                     valid_surveys.append(sn)
-            elif re.match(r'^\d{1,4}[/\-]\d{1,3}[A-Za-z]?$', sn):  # Survey/Hissa
+            elif self._SURVEY_HISSA_RE.match(sn):  # Survey/Hissa
                 parts = sn.split('/' if '/' in sn else '-')
                 survey_part = int(parts[0])
                 # Survey number should be reasonable (not a date)
@@ -294,45 +596,38 @@ class NERExtractor:
         
         for date in date_candidates:
             # Only accept with year (YYYY)
-            if re.match(r'^\d{1,2}[/-]\d{1,2}[/-]\d{4}$', date) or re.match(r'^\d{4}[/-]\d{1,2}[/-]\d{1,2}$', date):
+            if self._DATE_DMY_RE.match(date) or self._DATE_YMD_RE.match(date):
                 valid_dates.append(date)
         
         return list(dict.fromkeys(valid_dates))
     
     def _normalize_bank_names(self, bank_raw: List[str]) -> List[str]:
         """Normalize bank names using dictionary mapping (PROMPT 2)"""
-        # Bank name mappings
-        bank_mappings = {
-            'SBM': 'State Bank of Mysore (now SBI)',
-            'S.B.M': 'State Bank of Mysore (now SBI)',
-            'State Bank of Mysore': 'State Bank of Mysore (now SBI)',
-            'SBI': 'State Bank of India',
-            'State Bank of India': 'State Bank of India',
-            'HDFC': 'HDFC Bank',
-            'ICICI': 'ICICI Bank',
-            'Axis': 'Axis Bank',
-            'BOB': 'Bank of Baroda',
-            'PNB': 'Punjab National Bank',
-            'Canara': 'Canara Bank',
-            'Union': 'Union Bank'
-        }
-        
         normalized_banks = set()
         
         for bank in bank_raw:
             bank_clean = bank.strip().replace('.', '').replace('  ', ' ')
+            bank_upper = bank_clean.upper()
             
-            # Check against mappings
+            # Check against mappings (one automaton pass when available)
             matched = False
-            for key, normalized_name in bank_mappings.items():
-                if key.replace('.', '').upper() in bank_clean.upper():
-                    normalized_banks.add(normalized_name)
+            if self._bank_ac is not None:
+                hits = [value for _, value in self._bank_ac.iter(bank_upper)]
+                if hits:
+                    normalized_banks.add(min(hits)[1])
                     matched = True
-                    break
+            else:
+                for key_upper, normalized_name in self._bank_mapping_keys:
+                    if key_upper in bank_upper:
+                        normalized_banks.add(normalized_name)
+                        matched = True
+                        break
             
             # If no mapping but looks like a bank, keep it
-            if not matched and ('bank' in bank_clean.lower() or 'branch' in bank_clean.lower()):
-                normalized_banks.add(bank)
+            if not matched:
+                bank_lower = bank_clean.lower()
+                if 'bank' in bank_lower or 'branch' in bank_lower:
+                    normalized_banks.add(bank)
         
         return list(normalized_banks)
     
@@ -356,13 +651,13 @@ class NERExtractor:
         cleaned_surveys = []
         for sn in entities["survey_numbers"]:
             # Remove page markers: _page_1, -page-2, .page.3
-            cleaned = re.sub(r'[._-]page[_-]?\d+', '', sn, flags=re.IGNORECASE)
+            cleaned = self._PAGE_MARKER_RE.sub('', sn)
             # Remove file extensions
-            cleaned = re.sub(r'\.(jpg|jpeg|png|pdf|tiff?)$', '', cleaned, flags=re.IGNORECASE)
+            cleaned = self._FILE_EXT_RE.sub('', cleaned)
             # Remove underscore/dot/dash at boundaries
             cleaned = cleaned.strip('_.-')
             # Validate format (survey or survey/hissa)
-            if cleaned and len(cleaned) <= 20 and re.match(r'^\d+([/\-]\d+[A-Za-z]?)?$', cleaned):
+            if cleaned and len(cleaned) <= 20 and self._SURVEY_SHAPE_RE.match(cleaned):
                 cleaned_surveys.append(cleaned)
         entities["survey_numbers"] = cleaned_surveys
         
@@ -391,9 +686,8 @@ class NERExtractor:
             raise FileNotFoundError(f"File not found: {input_file}")
         
         # Read text
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            text = data.get('cleaned_text', '')
+        data = _load_json_file(input_path)
+        text = data.get('cleaned_text', '')
         
         # Extract entities
         entities = self.extract_entities(text)
@@ -403,9 +697,8 @@ class NERExtractor:
         rtc_fields_file = input_path.parent / f"{input_path.stem.replace('_ocr_cleaned', '')}_rtc_fields.json"
         if rtc_fields_file.exists():
             try:
-                with open(rtc_fields_file, 'r', encoding='utf-8') as f:
-                    rtc_fields = json.load(f)
-                    
+                rtc_fields = _load_json_file(rtc_fields_file)
+                
                 # PRIMARY SOURCE: Use filename-based survey/hissa (authoritative)
                 survey = rtc_fields.get('survey_number')
                 hissa = rtc_fields.get('hissa_number')
@@ -439,23 +732,18 @@ class NERExtractor:
                     # Extract bank names from loan context
                     if not entities['banks']:
                         for loan in loan_details:
+                            # One bank from the loan context is enough
+                            if entities['banks']:
+                                break
                             context = loan.get('context', '')
                             # Look for bank names in context
-                            bank_patterns = [
-                                r'(State Bank of Mysore|S\.?B\.?M\.?)',
-                                r'(State Bank of India|SBI)',
-                                r'(HDFC Bank|HDFC)',
-                                r'(ICICI Bank|ICICI)',
-                                r'(Axis Bank)',
-                                r'(Canara Bank)',
-                                r'(Bank of Baroda|BOB)',
-                            ]
-                            for pattern in bank_patterns:
-                                match = re.search(pattern, context, re.IGNORECASE)
+                            for pattern in self._BANK_PATTERNS:
+                                match = pattern.search(context)
                                 if match:
                                     bank_name = match.group(1)
                                     # Normalize bank name
-                                    if 'mysore' in bank_name.lower() or 'sbm' in bank_name.lower():
+                                    bank_lower = bank_name.lower()
+                                    if 'mysore' in bank_lower or 'sbm' in bank_lower:
                                         bank_name = 'State Bank of Mysore (now SBI)'
                                     if bank_name not in entities['banks']:
                                         entities['banks'].append(bank_name)
@@ -487,15 +775,14 @@ class NERExtractor:
         }
         
         # Save to JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(_dumps(result))
         
         result["output_file"] = str(output_path)
         return result
     
     def load_model(self, model_path: str):
         """Load trained spaCy model"""
-        self.nlp = spacy.load(model_path)
+        self.nlp = _load_spacy(model_path)
     
     def train_model(self, training_data: List, output_dir: str):
         """
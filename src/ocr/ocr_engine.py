@@ -8,37 +8,153 @@ import easyocr
 import fitz  # PyMuPDF
 import cv2
 import os
+import multiprocessing
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import json
 from datetime import datetime
+from functools import lru_cache
 from PIL import Image
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+# PDF render resolution; OCR gains nothing above ~200 DPI on printed forms
+PDF_DPI = int(os.getenv("PROPTRUST_OCR_DPI", "200"))
+# Pages per EasyOCR readtext_batched micro-batch
+OCR_BATCH_SIZE = int(os.getenv("PROPTRUST_OCR_BATCH", "8"))
+# EasyOCR pages whose Laplacian variance is below this are enhanced first
+SHARPNESS_THRESHOLD = float(os.getenv("PROPTRUST_OCR_SHARPNESS", "100"))
+# Default page worker processes; each EasyOCR worker loads its own Reader
+# and torch, so this stays small regardless of the CPU count
+OCR_WORKERS = int(os.getenv("PROPTRUST_OCR_WORKERS", "2"))
+PAGE_BREAK = "\n\n--- PAGE BREAK ---\n\n"
+# Placeholders marking where process_document streams text / writes the time
+_TEXT_SLOT = "\x00ocr-text\x00"
+_TIME_SLOT = "\x00processed-at\x00"
+
+
+def cuda_device_count() -> int:
+    """Number of CUDA devices OpenCV can use (0 for CPU-only builds)"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount()
+    except (AttributeError, cv2.error):
+        return 0
+
+
+@lru_cache(maxsize=2)
+def _get_easyocr(langs: tuple = ('kn', 'en'), gpu: bool = False):
+    """
+    Load an EasyOCR reader once per process and share it between engines
+    
+    Args:
+        langs: Language codes
+        gpu: Run detector/recognizer on CUDA
+        
+    Returns:
+        easyocr.Reader
+    """
+    print(f"Initializing EasyOCR reader ({', '.join(langs)}, {'GPU' if gpu else 'CPU'})...")
+    return easyocr.Reader(list(langs), gpu=gpu)
+
+
+# Per-process engine for page workers (see OCREngine._ocr_pages)
+_page_engine = None
+
+
+def _init_page_worker(denoise: str):
+    """Pool initializer: build this worker's EasyOCR engine once"""
+    global _page_engine
+    import torch
+    # One page per core: keep each worker single-threaded
+    torch.set_num_threads(1)
+    cv2.setNumThreads(1)
+    _page_engine = OCREngine(use_easyocr=True, denoise=denoise, max_workers=1, use_gpu=False)
+
+
+def _ocr_page_batch(pages: list) -> list:
+    """Pool task: OCR a run of pages (paths or arrays) with the worker's engine"""
+    return _page_engine._process_pages(pages)
+
 
 class OCREngine:
     """OCR processing engine for document text extraction"""
     
-    def __init__(self, use_easyocr=True):
+    def __init__(self, use_easyocr=True, denoise: str = None, max_workers: int = None,
+                 use_gpu: bool = None):
         """
         Initialize OCR Engine
         
         Args:
             use_easyocr: Whether to use EasyOCR (slower but better for Indian documents)
+            denoise: "nlmeans" (default) or "bilateral" (much cheaper on CPU);
+                default from PROPTRUST_OCR_DENOISE
+            max_workers: Parallel page workers for multi-page documents
+                (default PROPTRUST_OCR_WORKERS or 2)
+            use_gpu: Run EasyOCR on CUDA (default: when torch sees a GPU)
         """
         self.use_easyocr = use_easyocr
-        self.reader = None
+        self._reader = None
+        self.denoise = denoise or os.getenv("PROPTRUST_OCR_DENOISE", "nlmeans")
+        self.use_cuda = cuda_device_count() > 0
+        self.max_workers = max(1, max_workers or OCR_WORKERS)
+        self._page_pool = None
         
-        if use_easyocr:
-            print("Initializing EasyOCR reader with Kannada + English support...")
-            self.reader = easyocr.Reader(['kn', 'en'], gpu=False)
+        if use_gpu is None and use_easyocr:
+            import torch
+            use_gpu = torch.cuda.is_available()
+        self.use_gpu = bool(use_gpu)
     
-    def process_document(self, file_path: str, output_dir: str = None) -> dict:
+    @property
+    def reader(self):
+        """
+        EasyOCR reader, loaded on first use (None when using Tesseract)
+        
+        Multi-page CPU documents are OCR'd by the page workers, so the
+        main process only loads a Reader when it OCRs pages itself.
+        """
+        if self.use_easyocr and self._reader is None:
+            # Kannada + English; shared with other engines in this process
+            self._reader = _get_easyocr(('kn', 'en'), gpu=self.use_gpu)
+        return self._reader
+    
+    def close(self):
+        """Shut down the page worker pool (it is recreated on next use)"""
+        if self._page_pool is not None:
+            self._page_pool.shutdown()
+            self._page_pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def process_document(self, file_path: str, output_dir: str = None, save_images: bool = False,
+                         keep_text: bool = True) -> dict:
         """
         Process document and extract text
         
+        Page text is written to the _ocr.txt and _ocr.json files as each page
+        finishes, so the combined text is never built just to save it.
+        
         Args:
             file_path: Path to PDF/JPG/PNG file
             output_dir: Directory to save intermediate files
+            save_images: Also write rendered PDF pages to <output_dir>/images
+            keep_text: Return the combined text; when False the result has
+                "text_file" (the .txt path) instead, for very long documents
             
         Returns:
             dict: Extracted text and metadata
@@ -54,53 +170,61 @@ class OCREngine:
         
         images_dir = Path(output_dir) / "images"
         ocr_dir = Path(output_dir) / "ocr_text"
-        images_dir.mkdir(parents=True, exist_ok=True)
         ocr_dir.mkdir(parents=True, exist_ok=True)
         
-        # Extract images from PDF or load image
-        image_paths = []
+        # Render PDF pages in memory or use the image file as the only page
+        pages = []
         if file_path.suffix.lower() == '.pdf':
             print(f"Converting PDF to images: {file_path.name}")
-            image_paths = self.pdf_to_images(str(file_path), str(images_dir))
+            pages = self.pdf_to_images(str(file_path), str(images_dir), save_png=save_images)
         else:
-            # Copy image to images folder
-            image_paths = [str(file_path)]
+            pages = [str(file_path)]
         
-        # Process each image
-        all_text = []
-        for img_path in image_paths:
-            print(f"Processing image: {Path(img_path).name}")
-            
-            # Load and enhance image
-            image = cv2.imread(img_path)
-            enhanced = self.enhance_image(image)
-            
-            # Extract text
-            text = self.extract_text_from_array(enhanced)
-            all_text.append(text)
-        
-        # Combine all text
-        combined_text = "\n\n--- PAGE BREAK ---\n\n".join(all_text)
-        
-        # Create result object
+        # Create result object ("text" is streamed into the files below)
         result = {
             "property_id": f"PRT-{file_path.stem}",
             "file_path": str(file_path),
             "file_name": file_path.name,
-            "page_count": len(image_paths),
-            "text": combined_text,
-            "processed_at": datetime.now().isoformat()
+            "page_count": len(pages),
+            "text": _TEXT_SLOT,
+            "processed_at": _TIME_SLOT
         }
+        json_head, json_tail = _dumps(result).split(_dumps(_TEXT_SLOT))
         
-        # Save as JSON (for pipeline compatibility)
+        # Save as JSON (for pipeline compatibility) and plain text for easy reading
         json_file = ocr_dir / f"{file_path.stem}_ocr.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        # Also save plain text for easy reading
         txt_file = ocr_dir / f"{file_path.stem}_ocr.txt"
-        with open(txt_file, 'w', encoding='utf-8') as f:
-            f.write(combined_text)
+        kept_text = []
+        
+        # Process each page (pages run in parallel)
+        print(f"Processing {len(pages)} page(s): {file_path.name}")
+        try:
+            with open(json_file, 'wb') as json_out, open(txt_file, 'w', encoding='utf-8') as txt_out:
+                json_out.write(json_head + b'"')
+                for page_num, text in enumerate(self._iter_ocr_pages(pages)):
+                    if text is None:
+                        raise ValueError(f"Cannot read image file: {file_path}")
+                    if page_num:
+                        text = PAGE_BREAK + text
+                    
+                    txt_out.write(text)
+                    json_out.write(_dumps(text)[1:-1])
+                    if keep_text:
+                        kept_text.append(text)
+                
+                result["processed_at"] = datetime.now().isoformat()
+                json_out.write(b'"' + json_tail.replace(_dumps(_TIME_SLOT), _dumps(result["processed_at"])))
+        except BaseException:
+            # Do not leave half-written output for the next pipeline stage
+            json_file.unlink(missing_ok=True)
+            txt_file.unlink(missing_ok=True)
+            raise
+        
+        if keep_text:
+            result["text"] = "".join(kept_text)
+        else:
+            del result["text"]
+            result["text_file"] = str(txt_file)
         
         print(f"\n✅ OCR completed!")
         print(f"   JSON saved to: {json_file}")
@@ -108,73 +232,214 @@ class OCREngine:
         
         return result
     
-    def pdf_to_images(self, pdf_path: str, output_folder: str) -> list:
+    def _process_page(self, page):
         """
-        Convert PDF to images using PyMuPDF
+        Load, prepare and OCR one page image
+        
+        Args:
+            page: Path to page image, or the page as an image array
+            
+        Returns:
+            str: Extracted text, or None if the image cannot be read
+        """
+        image = cv2.imread(page) if isinstance(page, str) else page
+        if image is None:
+            return None
+        
+        return self.extract_text_from_array(self.prepare_image(image))
+    
+    def _process_pages(self, pages: list) -> list:
+        """
+        Load, prepare and OCR several pages, batching the OCR calls
+        
+        Args:
+            pages: Page image paths or image arrays
+            
+        Returns:
+            list: Text per page, in order (None for unreadable images)
+        """
+        images = [cv2.imread(page) if isinstance(page, str) else page for page in pages]
+        enhanced = [self.prepare_image(image) for image in images if image is not None]
+        texts = iter(self.extract_texts_from_arrays(enhanced))
+        return [next(texts) if image is not None else None for image in images]
+    
+    def _ocr_pages(self, pages: list) -> list:
+        """
+        OCR page images (see _iter_ocr_pages)
+        
+        Args:
+            pages: Page image paths or image arrays
+            
+        Returns:
+            list: Text per page, in order (None for unreadable images)
+        """
+        return list(self._iter_ocr_pages(pages))
+    
+    def _iter_ocr_pages(self, pages: list):
+        """
+        OCR page images, in parallel when there is more than one
+        
+        EasyOCR pages go to a spawned process pool that is created on first
+        use and kept for later documents (until close()), so each worker
+        loads its Reader once; each worker gets a run of at least two pages to batch. On GPU
+        all pages are batched on the shared reader instead. Tesseract pages
+        use threads (pytesseract runs the tesseract binary, so the GIL is
+        not held while it works).
+        
+        Args:
+            pages: Page image paths or image arrays
+            
+        Yields:
+            str: Text per page, in order (None for unreadable images)
+        """
+        workers = min(len(pages), self.max_workers)
+        
+        if not self.use_easyocr:
+            if workers <= 1:
+                for page in pages:
+                    yield self._process_page(page)
+                return
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                yield from executor.map(self._process_page, pages)
+            return
+        
+        if workers <= 1 or self.use_gpu:
+            for start in range(0, len(pages), OCR_BATCH_SIZE):
+                yield from self._process_pages(pages[start:start + OCR_BATCH_SIZE])
+            return
+        
+        size = max(2, -(-len(pages) // workers))
+        chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+        
+        if self._page_pool is None:
+            self._page_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_page_worker,
+                initargs=(self.denoise,)
+            )
+        for texts in self._page_pool.map(_ocr_page_batch, chunks):
+            yield from texts
+    
+    def pdf_to_images(self, pdf_path: str, output_folder: str = None, save_png: bool = False,
+                      dpi: int = PDF_DPI) -> list:
+        """
+        Render PDF pages to grayscale image arrays using PyMuPDF
+        
+        Pages are rendered as 8-bit gray and converted straight from the
+        pixmap buffer, so no PNG is encoded and decoded again unless
+        save_png is set.
         
         Args:
             pdf_path: Path to PDF file
-            output_folder: Folder to save images
+            output_folder: Folder to save PNG copies (needed with save_png)
+            save_png: Also save each page as <pdf>_page_<n>.png
+            dpi: Render resolution (default PROPTRUST_OCR_DPI or 200)
             
         Returns:
-            list: List of image file paths
+            list: Grayscale image arrays, one per page
         """
-        output_folder = Path(output_folder)
-        output_folder.mkdir(parents=True, exist_ok=True)
+        if save_png:
+            output_folder = Path(output_folder)
+            output_folder.mkdir(parents=True, exist_ok=True)
         
         # Open PDF
         pdf_document = fitz.open(pdf_path)
         
-        image_paths = []
+        images = []
         pdf_name = Path(pdf_path).stem
         
         # Convert each page to image
         for page_num in range(len(pdf_document)):
             page = pdf_document[page_num]
             
-            # Render page to image (300 DPI)
-            mat = fitz.Matrix(300/72, 300/72)  # 300 DPI scaling
-            pix = page.get_pixmap(matrix=mat)
+            # Render page to an 8-bit grayscale image
+            mat = fitz.Matrix(dpi/72, dpi/72)
+            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
             
-            # Save as PNG
-            image_path = output_folder / f"{pdf_name}_page_{page_num+1}.png"
-            pix.save(str(image_path))
+            image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+            images.append(image)
             
-            image_paths.append(str(image_path))
-            print(f"   Saved page {page_num+1}: {image_path.name}")
+            if save_png:
+                image_path = output_folder / f"{pdf_name}_page_{page_num+1}.png"
+                pix.save(str(image_path))
+                print(f"   Saved page {page_num+1}: {image_path.name}")
         
         pdf_document.close()
-        return image_paths
+        return images
+    
+    def prepare_image(self, image):
+        """
+        Get a page ready for OCR
+        
+        Tesseract always gets the enhanced (denoised, binarized) page.
+        EasyOCR does its own preprocessing, so sharp pages go to it as plain
+        grayscale; only blurry ones (Laplacian variance below
+        PROPTRUST_OCR_SHARPNESS, default 100) are enhanced.
+        
+        Args:
+            image: OpenCV image array (BGR or grayscale)
+            
+        Returns:
+            Image array to OCR
+        """
+        if not (self.use_easyocr and self.reader):
+            return self.enhance_image(image)
+        
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        if cv2.Laplacian(gray, cv2.CV_64F).var() < SHARPNESS_THRESHOLD:
+            return self.enhance_image(gray)
+        return gray
     
     def enhance_image(self, image):
         """
         Enhance image quality for better OCR
         
         Args:
-            image: OpenCV image array
+            image: OpenCV image array (BGR or grayscale)
             
         Returns:
             Enhanced image
         """
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Convert to grayscale (rendered PDF pages already are)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
         
         # Apply denoising
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        denoised = self._denoise(gray)
         
         # Apply adaptive thresholding
+        # (no 1x1 dilate/erode afterwards: a 1x1 kernel leaves the image unchanged)
         thresh = cv2.adaptiveThreshold(
             denoised, 255, 
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
             cv2.THRESH_BINARY, 11, 2
         )
         
-        # Dilation and erosion to remove noise
-        kernel = np.ones((1, 1), np.uint8)
-        processed = cv2.dilate(thresh, kernel, iterations=1)
-        processed = cv2.erode(processed, kernel, iterations=1)
+        return thresh
+    
+    def _denoise(self, gray):
+        """
+        Denoise a grayscale page
         
-        return processed
+        Non-local means runs on the GPU when OpenCV has CUDA, otherwise on
+        the CPU; "bilateral" trades some quality for a much cheaper filter.
+        
+        Args:
+            gray: Grayscale image array
+            
+        Returns:
+            Denoised image array
+        """
+        if self.denoise == "bilateral":
+            return cv2.bilateralFilter(gray, 5, 25, 25)
+        
+        if self.use_cuda:
+            gpu_gray = cv2.cuda_GpuMat()
+            gpu_gray.upload(gray)
+            gpu_denoised = cv2.cuda.fastNlMeansDenoising(gpu_gray, 10, search_window=21, block_size=7)
+            return gpu_denoised.download()
+        
+        return cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
     
     def extract_text_from_array(self, image_array) -> str:
         """
@@ -196,6 +461,43 @@ class OCREngine:
         
         return text
     
+    def extract_texts_from_arrays(self, image_arrays: list, batch_size: int = None) -> list:
+        """
+        Extract text from several image arrays, batching EasyOCR inference
+        
+        readtext_batched needs equally sized inputs, so pages are grouped by
+        shape (no resizing, same text as page-by-page readtext).
+        
+        Args:
+            image_arrays: numpy arrays of images
+            batch_size: EasyOCR batch size (default PROPTRUST_OCR_BATCH or 8)
+            
+        Returns:
+            list: Extracted text per image, in order
+        """
+        if not (self.use_easyocr and self.reader) or len(image_arrays) < 2 \
+                or not hasattr(self.reader, 'readtext_batched'):
+            return [self.extract_text_from_array(image_array) for image_array in image_arrays]
+        
+        groups = {}
+        for index, image_array in enumerate(image_arrays):
+            groups.setdefault(image_array.shape, []).append(index)
+        
+        texts = [None] * len(image_arrays)
+        for indices in groups.values():
+            if len(indices) == 1:
+                texts[indices[0]] = self.extract_text_from_array(image_arrays[indices[0]])
+                continue
+            
+            batch_results = self.reader.readtext_batched(
+                [image_arrays[index] for index in indices],
+                batch_size=batch_size or OCR_BATCH_SIZE
+            )
+            for index, results in zip(indices, batch_results):
+                texts[index] = "\n".join([result[1] for result in results])
+        
+        return texts
+    
     def extract_text(self, image_path: str) -> str:
         """
         Extract text from image or PDF file using OCR
@@ -210,32 +512,16 @@ class OCREngine:
         
         # Handle PDF files
         if file_path.suffix.lower() == '.pdf':
-            # Convert PDF to images temporarily
-            temp_dir = file_path.parent / "temp_images"
-            temp_dir.mkdir(exist_ok=True)
-            
+            # Render pages in memory (no temporary image files)
             try:
-                image_paths = self.pdf_to_images(str(file_path), str(temp_dir))
+                pages = self.pdf_to_images(str(file_path))
                 
                 # Extract text from all pages
-                all_text = []
-                for img_path in image_paths:
-                    image = cv2.imread(img_path)
-                    if image is not None:
-                        enhanced = self.enhance_image(image)
-                        text = self.extract_text_from_array(enhanced)
-                        all_text.append(text)
-                
-                # Clean up temp files
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
+                all_text = self._ocr_pages(pages)
                 
                 return "\n\n".join(all_text)
             except Exception as e:
                 print(f"❌ PDF processing error: {e}")
-                # Clean up on error
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
                 raise
         
         # Handle image files
@@ -243,5 +529,4 @@ class OCREngine:
         if image is None:
             raise ValueError(f"Cannot read image file: {image_path}")
         
-        enhanced = self.enhance_image(image)
-        return self.extract_text_from_array(enhanced)
+        return self.extract_text_from_array(self.prepare_image(image))
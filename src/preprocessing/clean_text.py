@@ -3,16 +3,82 @@ Text Preprocessing Module
 Cleans and normalizes OCR text output
 """
 
+import os
 import re
+import mmap
 import string
-from typing import Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import repeat
+from typing import Dict, List
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import json
 
+try:
+    import re2
+except ImportError:  # optional: stdlib re only
+    re2 = None
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+
+# Cleaned texts kept per TextCleaner, keyed by a digest of the raw text (LRU)
+CLEAN_CACHE_SIZE = int(os.getenv("PROPTRUST_CLEAN_CACHE", "256"))
+
+# Files at least this large are memory-mapped instead of read into bytes
+JSON_MMAP_THRESHOLD = int(os.getenv("PROPTRUST_JSON_MMAP_BYTES", str(4 * 1024 * 1024)))
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_json_file(path: Path):
+    """
+    Parse a JSON file, memory-mapping it when large (orjson only)
+    
+    Args:
+        path: JSON file path
+        
+    Returns:
+        Parsed JSON data
+    """
+    if orjson is None or path.stat().st_size < JSON_MMAP_THRESHOLD:
+        return _loads(path.read_bytes())
+    
+    # orjson parses the mapped pages directly, without a bytes copy
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _dumps(obj, pretty: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON bytes, indented or compact (orjson when available)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
 class TextCleaner:
     """Text preprocessing and cleaning utilities"""
     
+    # Characters IGNORECASE matches to ASCII letters but lower() does not
+    _UNFOLDED_CHARS = re.compile('[\u017f\u0130\u0131]')  # ſ, İ, ı
+    _FOLD_TABLE = str.maketrans({'\u017f': 's', '\u0130': 'i', '\u0131': 'i'})
+    
     def __init__(self):
         # Common OCR error mappings
         self.ocr_corrections = {
@@ -23,6 +89,15 @@ class TextCleaner:
             r'rn': 'm',  # Common OCR error
         }
         
+        # Whole-word OCR misreads (case-insensitive), keyword -> replacement
+        self.ocr_keywords = {
+            'ans grew': 'has granted',
+            'toan': 'loan',
+            'Ioan': 'loan',
+            '0f': 'of',
+            'lOan': 'loan',
+        }
+        
         # Keywords to preserve (case-insensitive)
         self.important_keywords = [
             'survey', 'owner', 'name', 'bank', 'loan', 'mortgage', 'encumbrance',
@@ -30,6 +105,214 @@ class TextCleaner:
             'taluk', 'district', 'extent', 'boundaries', 'north', 'south', 'east', 'west',
             'khata', 'hissa', 'acre', 'cents', 'hectare', 'property', 'land', 'plot'
         ]
+        
+        # blake2b(raw_text) -> cleaned text, for re-runs on unchanged OCR output
+        self._clean_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._clean_cache_lock = threading.Lock()
+        
+        # Also used directly by the clean_text fallback
+        self._control_chars = re.compile(r'[\x00-\x1F\x7F]')
+        
+        # Precompiled (pattern, replacement) passes, applied in order; plain
+        # literals (no metacharacters or escapes) stay strings for str.replace
+        self._ocr_correction_subs = [
+            (pattern if self._is_literal(pattern, replacement) else re.compile(pattern), replacement)
+            for pattern, replacement in self.ocr_corrections.items()
+        ]
+        
+        # (?<!\s) / (?<!\d): a match can only start where its run starts (a
+        # later start in the same run fails the same way), which keeps long
+        # whitespace or digit runs from being rescanned from every position
+        self._noise_subs = [
+            # Page headers/footers
+            (re.compile(r'First\s+Previous\s+Next\s+Last', re.IGNORECASE), ''),
+            (re.compile(r'Print Page[_\s]*No[:\s]*\d+', re.IGNORECASE), ''),
+            # Control characters only (Kannada and other Unicode text is kept)
+            (self._control_chars, ''),
+            # URLs and email-like patterns
+            (re.compile(r'http\S+|www\.\S+'), ''),
+            # Standalone special characters (but keep when part of text)
+            (re.compile(r'(?<!\s)\s+[.,;:!?]\s+'), ' '),
+        ]
+        
+        self._normalize_subs = [
+            # Survey numbers like 45/2A, 123/4B
+            (re.compile(r'(?<!\d)(\d+)\s*/\s*(\d+)'), r'\1/\2'),
+            # Date formats
+            (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), r'\1/\2/\3'),
+            # Spacing around punctuation. Kept as two template passes: a fused
+            # alternation needs a Python callback per match, which costs more
+            # than the second scan on typical OCR text.
+            (re.compile(r'(?<!\s)\s+([.,;:!?])'), r'\1'),
+            (re.compile(r'([.,;:!?])(\w)'), r'\1 \2'),
+        ]
+        
+        # Case for common abbreviations (whole words, one fused scan)
+        self._abbreviation_fused, self._abbreviation_dispatch = self._fuse_subs([
+            (re.compile(r'\b' + abbreviation + r'\b', re.IGNORECASE), abbreviation)
+            for abbreviation in ('RTC', 'EC', 'SBI', 'HDFC', 'ICICI')
+        ])
+        
+        # Word fixes, grouped into stages that each run as one fused scan.
+        # A pass whose output can change a later pass's word boundaries
+        # (Survey No. adds a space, S.B.M ends in a letter) closes its stage.
+        # Each stage is (literals, passes); at least one literal must occur in
+        # the lower-cased text for any of its passes to match.
+        self._ocr_stages = [
+            (('survey',), [
+                # Common word errors
+                (re.compile(r'\bSurvey\s+N[o0]\.?\s*', re.IGNORECASE), 'Survey No. '),
+            ]),
+            (('owner', 'grew', 'manager', *(keyword.lower() for keyword in self.ocr_keywords)), [
+                (re.compile(r'\bOwner\s+Name', re.IGNORECASE), 'Owner Name'),
+                # ISSUE 4 FIX: mixed Kannada-English loan context readability
+                *[
+                    (re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE), replacement)
+                    for keyword, replacement in self.ocr_keywords.items()
+                ],
+                (re.compile(r'\bthat\s+grew\b', re.IGNORECASE), 'has granted'),
+                (re.compile(r'\bManager\s+S\.B\.M\.?\b', re.IGNORECASE), 'Manager State Bank of Mysore'),
+            ]),
+            (('sb', 's.b'), [
+                (re.compile(r'\bS\.?B\.?M\.?\b', re.IGNORECASE), 'State Bank of Mysore'),
+            ]),
+            (('purava', 'rs', '/-'), [
+                (re.compile(r'\bPurava\s+branch\b', re.IGNORECASE), 'Puravara branch'),
+                # Rupee notation
+                (re.compile(r'\bRs\.?\s+'), 'Rs. '),
+                # Amount format: 550.000 -> 550,000
+                (re.compile(r'\b(\d{3,})\.\s*(\d{3})/-'), r'\1,\2/-'),
+            ]),
+        ]
+        self._ocr_fused_stages = [
+            (literals,) + self._fuse_subs(stage) + (self._re2_gate(stage),)
+            for literals, stage in self._ocr_stages
+        ]
+        
+        # Multiple newlines -> double newline
+        self._blank_lines = re.compile(r'\n\s*\n+')
+        
+        # Section headers: keyword anywhere in the line, ASCII case-insensitive
+        # (same as the keyword-in-line.lower() test it replaces)
+        self._section_header = re.compile(r'owner|survey|extent|boundaries', re.IGNORECASE | re.ASCII)
+        
+        # Words for to_json stats (same whitespace runs str.split() uses)
+        self._word_pat = re.compile(r'\S+')
+    
+    def _fold(self, text: str) -> str:
+        """
+        Lower-case text for the literal prefilters
+        
+        The few characters that IGNORECASE matches to ASCII letters but
+        lower() leaves alone are mapped first, so a pass can only be skipped
+        when it really cannot match.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            str: Lower-cased text
+        """
+        if self._UNFOLDED_CHARS.search(text):
+            text = text.translate(self._FOLD_TABLE)
+        return text.lower()
+    
+    @staticmethod
+    def _is_literal(pattern: str, replacement: str) -> bool:
+        """
+        Check whether a regex substitution is a plain str.replace
+        
+        Args:
+            pattern: Regex source
+            replacement: Replacement template
+            
+        Returns:
+            bool: True when neither side has regex metacharacters or escapes
+        """
+        return (
+            bool(pattern)
+            and not any(c in pattern for c in '\\.^$*+?()[]{}|')
+            and '\\' not in replacement
+        )
+    
+    @staticmethod
+    def _fuse_subs(subs):
+        """
+        Combine (pattern, replacement) passes into a single alternation
+        
+        Each pass becomes one outer group with its flags scoped to it; the
+        replacement callback picks the pass that matched by m.lastindex.
+        Replacement templates are parsed once here (numeric backreferences
+        only) instead of by m.expand on every match.
+        
+        Args:
+            subs: List of (compiled pattern, replacement) pairs
+            
+        Returns:
+            tuple: (fused compiled pattern, replacement callback for its sub)
+        """
+        # A leading \b shared by every pass is hoisted out of the alternation,
+        # otherwise each branch is tried (and fails) at every position
+        hoist = all(pattern.pattern.startswith(r'\b') for pattern, _ in subs)
+        
+        parts = []
+        replacements = {}
+        group = 1
+        for pattern, replacement in subs:
+            scoped = '(?i:' if pattern.flags & re.IGNORECASE else '(?:'
+            body = pattern.pattern[2:] if hoist else pattern.pattern
+            parts.append(f'({scoped}{body}))')
+            if '\\' in replacement:
+                # r'\1,\2/-' -> ['', 14, ',', 15, '/-'] (group numbers renumbered)
+                pieces = re.split(r'\\(\d+)', replacement)
+                replacements[group] = [
+                    piece if index % 2 == 0 else group + int(piece)
+                    for index, piece in enumerate(pieces)
+                ]
+            else:
+                replacements[group] = replacement
+            group += 1 + pattern.groups
+        
+        def dispatch(m):
+            replacement = replacements[m.lastindex]
+            if isinstance(replacement, str):
+                return replacement
+            return ''.join(
+                piece if isinstance(piece, str) else (m.group(piece) or '')
+                for piece in replacement
+            )
+        
+        return re.compile((r'\b(?:' if hoist else '(?:') + '|'.join(parts) + ')'), dispatch
+    
+    @staticmethod
+    def _re2_gate(subs):
+        """
+        Build an RE2 pattern that matches wherever any of the passes could
+        
+        RE2's word boundary, whitespace, digit and case folding are narrower
+        than re's, so the gate drops word boundaries and widens the rest: it
+        may fire without a real match, but never misses one. The re passes
+        still do the replacing.
+        
+        Args:
+            subs: List of (compiled pattern, replacement) pairs
+            
+        Returns:
+            RE2 pattern, or None when google-re2 is not installed
+        """
+        if re2 is None:
+            return None
+        
+        parts = []
+        for pattern, _ in subs:
+            body = re.sub(r'(?<!\\)[iI]', '[iIİı]', pattern.pattern)
+            body = body.replace(r'\b', '').replace(r'\s', r'[\s\x0b\x1c-\x1f\x85\pZ]').replace(r'\d', r'\pN')
+            parts.append(('(?i:' if pattern.flags & re.IGNORECASE else '(?:') + body + ')')
+        try:
+            return re2.compile('|'.join(parts))
+        except re2.error as e:
+            print(f"   [WARNING] RE2 gate disabled: {e}")
+            return None
     
     def clean_text(self, raw_text: str) -> str:
         """
@@ -45,6 +328,35 @@ class TextCleaner:
         if not raw_text or not raw_text.strip():
             return ""
         
+        if CLEAN_CACHE_SIZE <= 0:
+            return self._clean_text(raw_text)
+        
+        key = hashlib.blake2b(raw_text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._clean_cache_lock:
+            cached = self._clean_cache.get(key)
+            if cached is not None:
+                self._clean_cache.move_to_end(key)
+                return cached
+        
+        text = self._clean_text(raw_text)
+        
+        with self._clean_cache_lock:
+            self._clean_cache[key] = text
+            if len(self._clean_cache) > CLEAN_CACHE_SIZE:
+                self._clean_cache.popitem(last=False)
+        
+        return text
+    
+    def _clean_text(self, raw_text: str) -> str:
+        """
+        Run the cleaning steps on non-blank raw text (uncached)
+        
+        Args:
+            raw_text: Raw OCR output
+            
+        Returns:
+            str: Cleaned text
+        """
         # Step 1: Remove extreme noise
         text = self.remove_noise(raw_text)
         
@@ -60,9 +372,8 @@ class TextCleaner:
         # ISSUE 2 FIX: Safety check - if cleaned text is empty but raw wasn't, return minimally cleaned
         if not text.strip() and raw_text.strip():
             # Fallback: only remove control chars and normalize whitespace
-            text = re.sub(r'[\x00-\x1F\x7F]', '', raw_text)
-            text = re.sub(r' +', ' ', text)
-            text = text.strip()
+            text = self._control_chars.sub('', raw_text)
+            text = ' '.join(filter(None, text.split(' '))).strip()
         
         return text
     
@@ -77,21 +388,11 @@ class TextCleaner:
         Returns:
             str: Text with noise removed
         """
-        # Remove page headers/footers patterns
-        text = re.sub(r'First\s+Previous\s+Next\s+Last', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Print Page[_\s]*No[:\s]*\d+', '', text, flags=re.IGNORECASE)
-        
         # CRITICAL FIX: Do NOT remove Unicode characters (Kannada text)
-        # Only remove control characters and excessive symbols
         # Keep: letters (all scripts), digits, spaces, punctuation, currency symbols
-        # Remove only: control chars, excessive symbols
-        text = re.sub(r'[\x00-\x1F\x7F]', '', text)  # Control characters only
-        
-        # Remove URLs and email-like patterns
-        text = re.sub(r'http\S+|www\.\S+', '', text)
-        
-        # Remove standalone special characters (but keep when part of text)
-        text = re.sub(r'\s+[.,;:!?]\s+', ' ', text)
+        # Remove only: headers/footers, control chars, URLs, excessive symbols
+        for pattern, replacement in self._noise_subs:
+            text = pattern.sub(replacement, text)
         
         return text
     
@@ -105,23 +406,10 @@ class TextCleaner:
         Returns:
             str: Normalized text
         """
-        # Standardize number formats
-        # Preserve survey numbers like 45/2A, 123/4B
-        text = re.sub(r'(\d+)\s*/\s*(\d+)', r'\1/\2', text)
-        
-        # Standardize date formats
-        text = re.sub(r'(\d{1,2})/(\d{1,2})/(\d{4})', r'\1/\2/\3', text)
+        for pattern, replacement in self._normalize_subs:
+            text = pattern.sub(replacement, text)
         
-        # Fix spacing around punctuation
-        text = re.sub(r'\s+([.,;:!?])', r'\1', text)
-        text = re.sub(r'([.,;:!?])(\w)', r'\1 \2', text)
-        
-        # Standardize case for common abbreviations
-        text = re.sub(r'\brtc\b', 'RTC', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bec\b', 'EC', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bsbi\b', 'SBI', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bhdfc\b', 'HDFC', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bicici\b', 'ICICI', text, flags=re.IGNORECASE)
+        text = self._abbreviation_fused.sub(self._abbreviation_dispatch, text)
         
         return text
     
@@ -135,25 +423,25 @@ class TextCleaner:
         Returns:
             str: Text with OCR errors corrected
         """
-        for pattern, replacement in self.ocr_corrections.items():
-            text = re.sub(pattern, replacement, text)
-        
-        # Fix common word errors
-        text = re.sub(r'\bSurvey\s+N[o0]\.?\s*', 'Survey No. ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bOwner\s+Name', 'Owner Name', text, flags=re.IGNORECASE)
-        
-        # ISSUE 4 FIX: OCR normalization for mixed Kannada-English loan context readability
-        text = re.sub(r'\bans grew\b', 'has granted', text, flags=re.IGNORECASE)
-        text = re.sub(r'\btoan\b', 'loan', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bIoan\b', 'loan', text, flags=re.IGNORECASE)
-        text = re.sub(r'\b0f\b', 'of', text, flags=re.IGNORECASE)
-        text = re.sub(r'\blOan\b', 'loan', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bthat\s+grew\b', 'has granted', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bManager\s+S\.B\.M\.?\b', 'Manager State Bank of Mysore', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bS\.?B\.?M\.?\b', 'State Bank of Mysore', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bPurava\s+branch\b', 'Puravara branch', text, flags=re.IGNORECASE)
-        text = re.sub(r'\bRs\.?\s+', 'Rs. ', text)  # Standardize rupee notation
-        text = re.sub(r'\b(\d{3,})\.\s*(\d{3})/-', r'\1,\2/-', text)  # Fix amount format: 550.000 -> 550,000
+        for pattern, replacement in self._ocr_correction_subs:
+            if isinstance(pattern, str):
+                text = text.replace(pattern, replacement)
+            else:
+                text = pattern.sub(replacement, text)
+        
+        # Word fixes, rupee notation and amount format (one scan per stage;
+        # with google-re2 a linear-time scan first skips stages with no match)
+        fold = None
+        for literals, fused, dispatch, gate in self._ocr_fused_stages:
+            if fold is None:
+                fold = self._fold(text)
+            if not any(literal in fold for literal in literals):
+                continue
+            if gate is not None and gate.search(text) is None:
+                continue
+            result = fused.sub(dispatch, text)
+            if result is not text:
+                text, fold = result, None
         
         return text
     
@@ -167,11 +455,12 @@ class TextCleaner:
         Returns:
             str: Text with cleaned whitespace
         """
-        # Replace multiple spaces with single space
-        text = re.sub(r' +', ' ', text)
+        # Multiple spaces -> single space (split/join is cheaper than a regex;
+        # spaces it drops at the very ends are stripped below anyway)
+        text = ' '.join(filter(None, text.split(' ')))
         
         # Replace multiple newlines with double newline
-        text = re.sub(r'\n\s*\n+', '\n\n', text)
+        text = self._blank_lines.sub('\n\n', text)
         
         # Remove leading/trailing whitespace from each line
         lines = [line.strip() for line in text.split('\n')]
@@ -189,29 +478,21 @@ class TextCleaner:
         Returns:
             dict: Extracted sections
         """
-        sections = {}
-        
         # Try to identify and extract important sections
         lines = text.split('\n')
-        current_section = "general"
-        sections[current_section] = []
+        header_search = self._section_header.search
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line is a section header
-            lower_line = line.lower()
-            if any(keyword in lower_line for keyword in ['owner', 'survey', 'extent', 'boundaries']):
-                current_section = line
-                sections[current_section] = []
-            else:
-                sections[current_section].append(line)
+        # (section name, index of its first line); header lines are not content
+        starts = [("general", 0)]
+        for index, line in enumerate(lines):
+            if header_search(line):
+                starts.append((line.strip(), index + 1))
+        ends = [start - 1 for _, start in starts[1:]] + [len(lines)]
         
-        # Convert lists to strings
-        for key in sections:
-            sections[key] = '\n'.join(sections[key])
+        # A repeated header replaces the earlier section's content
+        sections = {}
+        for (name, start), end in zip(starts, ends):
+            sections[name] = '\n'.join(filter(None, map(str.strip, lines[start:end])))
         
         return sections
     
@@ -225,20 +506,37 @@ class TextCleaner:
         Returns:
             dict: JSON output
         """
+        # Count without building word/line lists (an empty text is still one line)
+        word_count = sum(1 for _ in self._word_pat.finditer(cleaned_text))
+        
         return {
             "clean_text": cleaned_text,
             "char_count": len(cleaned_text),
-            "word_count": len(cleaned_text.split()),
-            "line_count": len(cleaned_text.split('\n'))
+            "word_count": word_count,
+            "line_count": cleaned_text.count('\n') + 1
         }
     
-    def process_file(self, input_file: str, output_file: str = None) -> Dict:
+    def clean_texts(self, raw_texts: List[str]) -> List[str]:
+        """
+        Clean a batch of OCR texts
+        
+        Args:
+            raw_texts: Raw OCR outputs
+            
+        Returns:
+            list: Cleaned texts, in input order
+        """
+        clean_text = self.clean_text
+        return [clean_text(raw_text) for raw_text in raw_texts]
+    
+    def process_file(self, input_file: str, output_file: str = None, pretty: bool = False) -> Dict:
         """
         Process a text file and clean it
         
         Args:
             input_file: Path to input text file
             output_file: Path to save cleaned text (optional)
+            pretty: Indent the JSON output for humans (default: compact)
             
         Returns:
             dict: Processing results
@@ -250,13 +548,11 @@ class TextCleaner:
         
         # Read input (support both .txt and .json)
         if input_path.suffix == '.json':
-            with open(input_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Check for translated_text first (from translation), then 'text' (from OCR)
-                raw_text = data.get('translated_text', data.get('text', ''))
+            data = _load_json_file(input_path)
+            # Check for translated_text first (from translation), then 'text' (from OCR)
+            raw_text = data.get('translated_text', data.get('text', ''))
         else:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                raw_text = f.read()
+            raw_text = input_path.read_text(encoding='utf-8')
         
         # Clean text
         cleaned_text = self.clean_text(raw_text)
@@ -274,13 +570,11 @@ class TextCleaner:
         json_output['original_char_count'] = len(raw_text)
         
         # Save as JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(json_output, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(_dumps(json_output, pretty))
         
         # Also save as plain text for easy reading
         txt_path = output_path.parent / f"{output_path.stem}.txt"
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned_text)
+        txt_path.write_text(cleaned_text, encoding='utf-8')
         
         return {
             "raw_text": raw_text,
@@ -289,3 +583,44 @@ class TextCleaner:
             "txt_file": str(txt_path),
             "stats": json_output
         }
+    
+    def process_files(self, input_files: List[str], workers: int = None,
+                      pretty: bool = False) -> List[Dict]:
+        """
+        Clean many files across processes (read, clean and write per worker)
+        
+        Workers use a default TextCleaner; outputs go next to each input.
+        
+        Args:
+            input_files: Paths to input text/JSON files
+            workers: Worker process count (default: os.cpu_count())
+            pretty: Indent the JSON outputs for humans (default: compact)
+            
+        Returns:
+            list: process_file results, in input order
+        """
+        input_files = [str(path) for path in input_files]
+        if not input_files:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(input_files) == 1:
+            return [self.process_file(path, pretty=pretty) for path in input_files]
+        
+        # Large chunks amortize IPC, but keep every worker busy on small batches
+        chunksize = max(1, min(32, len(input_files) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=min(workers, len(input_files))) as executor:
+            return list(executor.map(_process_file_worker, input_files,
+                                     repeat(pretty), chunksize=chunksize))
+
+
+# Per-process cleaner for process_files workers (built on first task)
+_worker_cleaner = None
+
+
+def _process_file_worker(input_file: str, pretty: bool = False) -> Dict:
+    """Pool task: clean one file with this worker's TextCleaner"""
+    global _worker_cleaner
+    if _worker_cleaner is None:
+        _worker_cleaner = TextCleaner()
+    return _worker_cleaner.process_file(input_file, pretty=pretty)